@@ -0,0 +1,113 @@
+# benchmarks/alert_memory.py
+"""
+Measure bytes per alert held in memory: raw NWS JSON dicts vs compact Alert records.
+
+Usage (from the project root):
+    python benchmarks/alert_memory.py --alerts 5000
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from weather_models import parse_alerts  # noqa: E402
+
+EVENTS = ["Flood Warning", "Heat Advisory", "Winter Storm Watch", "Red Flag Warning",
+          "Special Weather Statement", "Wind Advisory", "Small Craft Advisory"]
+SEVERITIES = ["Minor", "Moderate", "Severe", "Extreme", "Unknown"]
+AREAS = ["Coastal Del Norte", "Northern Humboldt Interior", "Sacramento Valley",
+         "San Francisco Bay Shoreline", "Santa Cruz Mountains", "Mojave Desert"]
+
+
+def make_feature(index: int, rng: random.Random) -> dict:
+    """Builds one alert feature shaped like an /alerts/active entry."""
+    alert_id = f"urn:oid:2.49.0.1.840.0.{index:040x}.001.1"
+    lon, lat = -120 + rng.random() * 5, 35 + rng.random() * 5
+    ring = [[lon + rng.random(), lat + rng.random()] for _ in range(24)]
+    ring.append(ring[0])
+    return {
+        "id": f"https://api.weather.gov/alerts/{alert_id}",
+        "type": "Feature",
+        "geometry": {"type": "Polygon", "coordinates": [ring]},
+        "properties": {
+            "@id": f"https://api.weather.gov/alerts/{alert_id}",
+            "@type": "wx:Alert",
+            "id": alert_id,
+            "areaDesc": rng.choice(AREAS),
+            "geocode": {
+                "SAME": [f"006{rng.randint(0, 999):03d}" for _ in range(3)],
+                "UGC": [f"CAZ{rng.randint(0, 999):03d}" for _ in range(3)],
+            },
+            "affectedZones": [
+                f"https://api.weather.gov/zones/forecast/CAZ{rng.randint(0, 999):03d}"
+                for _ in range(3)
+            ],
+            "references": [],
+            "sent": "2025-05-11T10:00:00-07:00",
+            "effective": "2025-05-11T10:00:00-07:00",
+            "onset": "2025-05-11T12:00:00-07:00",
+            "expires": "2025-05-12T10:00:00-07:00",
+            "ends": "2025-05-12T18:00:00-07:00",
+            "updated": "2025-05-11T10:00:00-07:00",
+            "status": "Actual",
+            "messageType": "Alert",
+            "category": "Met",
+            "severity": rng.choice(SEVERITIES),
+            "certainty": "Likely",
+            "urgency": "Expected",
+            "event": rng.choice(EVENTS),
+            "sender": "w-nws.webmaster@noaa.gov",
+            "senderName": "NWS Sacramento CA",
+            "headline": "Alert issued May 11 at 10:00AM PDT by NWS Sacramento CA",
+            "description": "* WHAT...Conditions expected. " * 8,
+            "instruction": "Take the usual precautions. " * 4,
+            "response": "Prepare",
+            "parameters": {
+                "AWIPSidentifier": ["NPWSTO"],
+                "WMOidentifier": ["WWUS76 KSTO 111700"],
+                "NWSheadline": ["ALERT IN EFFECT"],
+                "BLOCKCHANNEL": ["EAS", "NWEM", "CMAS"],
+            },
+        },
+    }
+
+
+def measure(build) -> tuple[int, object]:
+    """Returns the bytes still allocated by build()'s result, and the result."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--alerts", type=int, default=5000, help="Number of alerts.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Round-trip through JSON text so strings are not shared, as with a real response
+    features = [make_feature(i, rng) for i in range(args.alerts)]
+    payload = json.dumps({"features": features})
+
+    raw_bytes, raw = measure(lambda: json.loads(payload))
+    del raw
+    compact_bytes, compact = measure(lambda: parse_alerts(json.loads(payload)))
+
+    print(f"alerts:           {args.alerts}")
+    print(f"raw JSON dicts:   {raw_bytes / args.alerts:10.0f} bytes/alert")
+    print(f"compact Alert:    {compact_bytes / args.alerts:10.0f} bytes/alert")
+    print(f"reduction:        {raw_bytes / max(compact_bytes, 1):10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/fake_nws.py
+"""
+Local stand-in for api.weather.gov that replays recorded payloads.
+
+Serves /points/{lat},{lon}, /gridpoints/{office}/{x},{y}[/forecast] and
+/alerts/active/area/{state} from benchmarks/fixtures, with configurable
+latency, jitter and error injection.
+
+Usage (from the project root):
+    python benchmarks/fake_nws.py --port 8001 --latency-ms 80 --jitter-ms 40
+    python benchmarks/fake_nws.py --port 8001 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import logging
+import random
+from pathlib import Path
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+class FakeNWSConfig:
+    """Latency and fault injection settings."""
+
+    def __init__(
+        self,
+        base_url: str,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+
+
+def load_fixture(name: str, base_url: str) -> bytes:
+    """Reads a recorded payload, pointing its embedded URLs at this server."""
+    text = (FIXTURES_DIR / f"{name}.json").read_text()
+    return text.replace("{base}", base_url).encode()
+
+
+def create_app(config: FakeNWSConfig) -> Starlette:
+    """Builds the fake NWS ASGI app. Payloads are pre-encoded once at startup."""
+    payloads = {
+        name: load_fixture(name, config.base_url)
+        for name in ("points", "forecast", "gridpoint", "alerts")
+    }
+    stats = {"requests": 0, "errors": 0}
+
+    async def replay(name: str) -> Response:
+        stats["requests"] += 1
+        jitter = config.random.uniform(-config.jitter_ms, config.jitter_ms)
+        delay = config.latency_ms + jitter
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if config.random.random() < config.error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                {"title": "Unexpected Problem", "status": 500}, status_code=500
+            )
+        return Response(payloads[name], media_type="application/geo+json")
+
+    async def points(request: Request):
+        return await replay("points")
+
+    async def forecast(request: Request):
+        return await replay("forecast")
+
+    async def gridpoint(request: Request):
+        return await replay("gridpoint")
+
+    async def alerts(request: Request):
+        return await replay("alerts")
+
+    async def get_stats(request: Request):
+        return JSONResponse(stats)
+
+    return Starlette(routes=[
+        Route("/points/{coordinates}", points),
+        Route("/gridpoints/{office}/{grid}/forecast", forecast),
+        Route("/gridpoints/{office}/{grid}", gridpoint),
+        Route("/alerts/active/area/{state}", alerts),
+        Route("/_stats", get_stats),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local NWS stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeNWSConfig(
+        base_url=f"http://{args.host}:{args.port}",
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    logging.basicConfig(level=logging.INFO)
+    logger.info(
+        f"Fake NWS on {config.base_url} (latency={args.latency_ms}ms "
+        f"jitter={args.jitter_ms}ms errors={args.error_rate:.1%})"
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+# benchmarks/load_test.py
+"""
+Load test the weather server against a local NWS stand-in.
+
+Starts benchmarks/fake_nws.py and the FastAPI app (one uvicorn worker) as
+subprocesses, then drives the REST routes and real MCP sessions over
+/sse + /messages/. Reports requests/sec, p50/p99 latency, server memory and
+how many concurrent MCP sessions the worker sustained, and saves the results
+to benchmarks/results/ so runs can be compared between commits.
+
+Usage (from the project root):
+    python benchmarks/load_test.py --duration 10 --concurrency 32 --sessions 100
+    python benchmarks/load_test.py --latency-ms 80 --jitter-ms 40 --compare latest
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import secrets
+import subprocess
+import sys
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+import httpx
+from passlib.hash import bcrypt
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_DIR = BENCH_DIR.parent
+RESULTS_DIR = BENCH_DIR / "results"
+
+# Demo user the benchmark configures on the app it starts (see src/auth.py)
+USERNAME = "testuser"
+PASSWORD = secrets.token_urlsafe(16)
+
+
+# --- Helpers ---
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Turns raw latencies (seconds) into the reported statistics."""
+    latencies.sort()
+    ms = lambda value: None if value is None else round(value * 1000, 2)  # noqa: E731
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+    }
+
+
+def process_memory_kb(pid: int) -> dict:
+    """Resident and peak resident memory of a process (Linux /proc only)."""
+    status_file = Path(f"/proc/{pid}/status")
+    if not status_file.exists():
+        return {"rss_kb": None, "peak_rss_kb": None}
+    fields = {}
+    for line in status_file.read_text().splitlines():
+        key, _, value = line.partition(":")
+        if key in ("VmRSS", "VmHWM"):
+            fields[key] = int(value.split()[0])
+    return {"rss_kb": fields.get("VmRSS"), "peak_rss_kb": fields.get("VmHWM")}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url, timeout=1.0)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start within {timeout}s")
+
+
+# --- Servers ---
+def start_fake_nws(args) -> subprocess.Popen:
+    command = [
+        sys.executable, str(BENCH_DIR / "fake_nws.py"),
+        "--port", str(args.nws_port),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate),
+        "--seed", str(args.seed),
+    ]
+    return subprocess.Popen(
+        command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+
+def start_app(args) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "NWS_API_BASE": f"http://127.0.0.1:{args.nws_port}",
+        # Quotas would otherwise dominate a single-client benchmark
+        "RATE_LIMIT_RATE": "1e9",
+        "RATE_LIMIT_BURST": "1e9",
+        "DEMO_USERNAME": USERNAME,
+        "DEMO_USER_PASSWORD_HASH": bcrypt.hash(PASSWORD),
+    })
+    command = [
+        sys.executable, "-m", "uvicorn", "weather_app:app",
+        "--port", str(args.app_port), "--log-level", "warning",
+    ]
+    return subprocess.Popen(
+        command, cwd=PROJECT_DIR / "src", env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+# --- Scenarios ---
+async def run_rest(base_url: str, token: str, path: str, params: dict, args) -> dict:
+    """Closed-loop REST load: `concurrency` workers hammering one route."""
+    latencies: list[float] = []
+    errors = 0
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, headers=headers, limits=limits
+    ) as client:
+        deadline = time.monotonic() + args.duration
+
+        async def worker():
+            nonlocal errors
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path, params=params, timeout=30.0)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.monotonic() - started
+    return summarize(latencies, errors, elapsed)
+
+
+async def run_mcp(base_url: str, token: str, args) -> dict:
+    """Closed-loop MCP load: each client session alternates tool calls."""
+    latencies: list[float] = []
+    errors = 0
+    headers = {"Authorization": f"Bearer {token}"}
+    calls = [
+        ("get_alerts", {"state": "CA"}),
+        ("get_forecast", {"latitude": 38.5816, "longitude": -121.4944}),
+    ]
+
+    async def client_loop(deadline: float):
+        nonlocal errors
+        async with sse_client(f"{base_url}/sse", headers=headers) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                index = 0
+                while time.monotonic() < deadline:
+                    name, arguments = calls[index % len(calls)]
+                    index += 1
+                    started = time.perf_counter()
+                    try:
+                        result = await session.call_tool(name, arguments)
+                        ok = not result.isError
+                    except Exception:
+                        ok = False
+                    if ok:
+                        latencies.append(time.perf_counter() - started)
+                    else:
+                        errors += 1
+
+    started = time.monotonic()
+    deadline = started + args.duration
+    await asyncio.gather(*(client_loop(deadline) for _ in range(args.mcp_clients)))
+    return summarize(latencies, errors, time.monotonic() - started)
+
+
+async def run_sessions(base_url: str, token: str, app_pid: int, args) -> dict:
+    """Opens idle MCP sessions in steps until the target or the first failure."""
+    headers = {"Authorization": f"Bearer {token}"}
+    before = process_memory_kb(app_pid)["rss_kb"]
+    opened = 0
+    failure = None
+    async with AsyncExitStack() as stack:
+        async def open_session():
+            read, write = await stack.enter_async_context(
+                sse_client(f"{base_url}/sse", headers=headers)
+            )
+            session = await stack.enter_async_context(ClientSession(read, write))
+            await asyncio.wait_for(session.initialize(), timeout=10.0)
+
+        while opened < args.sessions:
+            batch = min(args.session_step, args.sessions - opened)
+            try:
+                # Sessions are opened one at a time so the exit stack stays ordered
+                for _ in range(batch):
+                    await open_session()
+                    opened += 1
+            except Exception as exc:
+                failure = repr(exc)
+                break
+        after = process_memory_kb(app_pid)["rss_kb"]
+
+    per_session = None
+    if before is not None and after is not None and opened:
+        per_session = round((after - before) / opened, 1)
+    return {
+        "target": args.sessions,
+        "sustained": opened,
+        "rss_kb_per_session": per_session,
+        "failure": failure,
+    }
+
+
+# --- Results ---
+def latest_result() -> Path | None:
+    files = sorted(RESULTS_DIR.glob("*.json"))
+    return files[-1] if files else None
+
+
+def save_result(result: dict) -> Path:
+    RESULTS_DIR.mkdir(exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    path = RESULTS_DIR / f"{stamp}-{result['commit']}.json"
+    path.write_text(json.dumps(result, indent=2))
+    return path
+
+
+def print_report(result: dict, baseline: dict | None) -> None:
+    def delta(new, old):
+        if baseline is None or new is None or old is None or old == 0:
+            return ""
+        return f" ({(new - old) / old:+.1%})"
+
+    print(f"commit {result['commit']}  duration {result['config']['duration']}s")
+    print(f"{'scenario':<14}{'rps':>18}{'p50 ms':>20}{'p99 ms':>20}{'errors':>8}")
+    for name, stats in result["scenarios"].items():
+        old = (baseline or {}).get("scenarios", {}).get(name, {})
+        print(
+            f"{name:<14}"
+            f"{str(stats['rps']) + delta(stats['rps'], old.get('rps')):>18}"
+            f"{str(stats['p50_ms']) + delta(stats['p50_ms'], old.get('p50_ms')):>20}"
+            f"{str(stats['p99_ms']) + delta(stats['p99_ms'], old.get('p99_ms')):>20}"
+            f"{stats['errors']:>8}"
+        )
+    memory = result["memory"]
+    print(f"server memory: rss {memory['rss_kb']} kB, peak {memory['peak_rss_kb']} kB")
+    sessions = result["sessions"]
+    print(
+        f"sessions/worker: {sessions['sustained']}/{sessions['target']} "
+        f"({sessions['rss_kb_per_session']} kB each)"
+        + (f", stopped by {sessions['failure']}" if sessions["failure"] else "")
+    )
+    if baseline is not None:
+        print(f"compared with commit {baseline.get('commit')}")
+
+
+async def run(args) -> dict:
+    base_url = f"http://127.0.0.1:{args.app_port}"
+    nws = start_fake_nws(args)
+    app = start_app(args)
+    try:
+        await wait_until_ready(f"http://127.0.0.1:{args.nws_port}/_stats")
+        await wait_until_ready(f"{base_url}/status")
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            response = await client.post(
+                "/token", data={"username": USERNAME, "password": PASSWORD}
+            )
+            response.raise_for_status()
+            token = response.json()["access_token"]
+
+        scenarios = {
+            "rest_alerts": await run_rest(
+                base_url, token, "/get_alerts", {"state": "CA"}, args
+            ),
+            "rest_forecast": await run_rest(
+                base_url, token, "/get_forecast",
+                {"latitude": 38.5816, "longitude": -121.4944}, args,
+            ),
+            "rest_analytics": await run_rest(
+                base_url, token, "/analyze_gridpoints",
+                # The recorded gridpoint payload starts at this hour
+                {"location": "STO/41,68", "layer": "temperature", "below": 10,
+                 "resample_hours": 6, "start": "2025-05-11T10:00:00+00:00"}, args,
+            ),
+            "mcp_tools": await run_mcp(base_url, token, args),
+        }
+        memory = process_memory_kb(app.pid)
+        sessions = await run_sessions(base_url, token, app.pid, args)
+    finally:
+        for process in (app, nws):
+            process.terminate()
+            process.wait(timeout=10)
+
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            key: getattr(args, key)
+            for key in ("duration", "concurrency", "mcp_clients", "sessions",
+                        "latency_ms", "jitter_ms", "error_rate", "seed")
+        },
+        "scenarios": scenarios,
+        "memory": memory,
+        "sessions": sessions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the weather server.")
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds per scenario."
+    )
+    parser.add_argument("--concurrency", type=int, default=32, help="REST workers.")
+    parser.add_argument(
+        "--mcp-clients", type=int, default=8,
+        help="Concurrent MCP sessions making tool calls.",
+    )
+    parser.add_argument(
+        "--sessions", type=int, default=100, help="Idle MCP sessions to hold open."
+    )
+    parser.add_argument("--session-step", type=int, default=25)
+    parser.add_argument(
+        "--latency-ms", type=float, default=50.0, help="Fake NWS latency."
+    )
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--nws-port", type=int, default=8766)
+    parser.add_argument("--compare", help="Results file to compare with, or 'latest'.")
+    parser.add_argument(
+        "--no-save", action="store_true", help="Do not write a results file."
+    )
+    args = parser.parse_args()
+
+    baseline_path = latest_result() if args.compare == "latest" else args.compare
+    baseline = json.loads(Path(baseline_path).read_text()) if baseline_path else None
+
+    result = asyncio.run(run(args))
+    print_report(result, baseline)
+    if not args.no_save:
+        print(f"saved {save_result(result)}")
+
+
+if __name__ == "__main__":
+    main()
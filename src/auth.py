@@ -1,7 +1,12 @@
 # src/auth.py
 
+import asyncio
+import hashlib
 import logging
 import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
@@ -18,6 +23,14 @@ logger = logging.getLogger(__name__)
 SECRET_KEY = os.environ.get("SECRET_KEY", "YOUR_DEFAULT_SUPER_SECRET_KEY") # CHANGE THIS!
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Maximum number of verified tokens kept in memory (LRU eviction beyond this)
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", "10000"))
+# Maximum number of bcrypt verifications allowed to run at the same time
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+# Optional demo account for development. The user only exists when a bcrypt
+# hash of its password is configured; otherwise every login is rejected.
+DEMO_USERNAME = os.environ.get("DEMO_USERNAME", "testuser")
+DEMO_USER_PASSWORD_HASH = os.environ.get("DEMO_USER_PASSWORD_HASH")
 
 # --- Security Scheme ---
 # This tells FastAPI to expect a Bearer token in the Authorization header
@@ -37,10 +50,63 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     logger.info(f"Access token created for user: {data.get('sub')}")
     return encoded_jwt
 
+# --- Verified Token Cache ---
+class TokenCache:
+    """
+    Bounded LRU cache of verified token claims.
+
+    Entries are keyed by a SHA-256 digest of the raw token (so the tokens
+    themselves are never kept in memory) and expire at the token's `exp` claim.
+    """
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        """Returns the cached user data for a token, or None if absent or expired."""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, user_data = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return user_data
+
+    def put(self, token: str, user_data: dict, expires_at: float) -> None:
+        """Stores verified user data until the token expires."""
+        if self.maxsize <= 0:
+            return
+        key = self._key(token)
+        self._entries[key] = (expires_at, user_data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache()
+
+
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
     """
     Dependency to get the current authenticated user from the JWT token.
     Raises HTTPException if the token is invalid or expired.
+
+    Verified claims are cached until the token expires, so repeated requests
+    with the same token skip the signature check.
     """
     logger.debug("get_current_user called.")
     credentials_exception = HTTPException(
@@ -48,6 +114,10 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cached_user = token_cache.get(token)
+    if cached_user is not None:
+        logger.debug(f"Token cache hit for user: {cached_user['username']}")
+        return cached_user
     try:
         # Decode and verify the token signature and expiration
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -65,8 +135,13 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
         # using the username to ensure they still exist and are active.
         # For this example, we'll just return the payload data as the "user".
         user_data = {"username": username, "roles": user_roles}
+        expires_at = payload.get("exp")
+        if expires_at is not None:
+            token_cache.put(token, user_data, float(expires_at))
         logger.info(f"Authenticated user: {username}")
         return user_data # Return user information
+    except HTTPException:
+        raise
     except JWTError as e:
         logger.error(f"JWTError during authentication: {e}")
         raise credentials_exception
@@ -84,29 +159,76 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
 from passlib.context import CryptContext
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-# Create a dummy hashed password for 'testuser'
-# You would generate this when creating a user in a real system
-# print(pwd_context.hash("securepassword123")) # Example of how to generate hash
-FAKE_HASHED_PASSWORD = "$2b$12$EXAMPLEHASHEDPASSWORD..." # REPLACE with a real bcrypt hash!
-
-fake_users_db = {
-    "testuser": {
-        "username": "testuser",
-        "hashed_password": FAKE_HASHED_PASSWORD,
+# The demo user is only created when DEMO_USER_PASSWORD_HASH is set.
+# You would generate the hash when creating a user in a real system:
+# print(pwd_context.hash("your-password"))
+fake_users_db = {}
+if DEMO_USER_PASSWORD_HASH:
+    fake_users_db[DEMO_USERNAME] = {
+        "username": DEMO_USERNAME,
+        "hashed_password": DEMO_USER_PASSWORD_HASH,
         "roles": ["user"], # Example roles
     }
-}
+
+# bcrypt is deliberately slow (~100 ms per check), so it runs in a dedicated
+# thread pool instead of on the event loop. The pool size caps how many
+# verifications can run at once; extra requests wait in the pool's queue.
+_password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifies a plain password against a bcrypt hashed password."""
     logger.debug("Verifying password.")
     return pwd_context.verify(plain_password, hashed_password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verifies a password in the bcrypt thread pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, verify_password, plain_password, hashed_password
+    )
+
 def get_user(username: str):
     """Retrieves user data from the dummy database (example)."""
     logger.debug(f"Fetching user from DB: {username}")
     return fake_users_db.get(username)
 
+async def authenticate_user(username: str, password: str) -> dict | None:
+    """Returns the user if the username and password are valid, otherwise None."""
+    user = get_user(username)
+    if user is None:
+        logger.warning(f"Login attempt for unknown user: {username}")
+        return None
+    if not await verify_password_async(password, user["hashed_password"]):
+        logger.warning(f"Invalid password for user: {username}")
+        return None
+    return user
+
+
+# --- SSE Session Authentication ---
+# An SSE connection is authenticated once, when /sse is opened. The MCP
+# session id handed to the client is then bound to that user, and messages
+# posted to /messages/?session_id=... are authorised by looking up the
+# binding instead of re-verifying a token on every message.
+_session_users: dict[str, dict] = {}
+
+def bind_session(session_id: str, user: dict) -> None:
+    """Associates an MCP SSE session id with an authenticated user."""
+    _session_users[session_id] = user
+    logger.debug(f"Bound SSE session {session_id} to user: {user.get('username')}")
+
+def unbind_session(session_id: str) -> None:
+    """Forgets an MCP SSE session once its stream is closed."""
+    _session_users.pop(session_id, None)
+    logger.debug(f"Unbound SSE session {session_id}")
+
+def get_session_user(session_id: str | None) -> dict | None:
+    """Returns the user bound to an MCP SSE session id, if any."""
+    if session_id is None:
+        return None
+    return _session_users.get(session_id)
+
 # --- Authorization Helper (Optional) ---
 def require_role(role: str):
     """Dependency to check if the current user has a specific role."""
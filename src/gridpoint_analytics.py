@@ -0,0 +1,325 @@
+# src/gridpoint_analytics.py
+
+import asyncio
+import logging
+import os
+import re
+import warnings
+from datetime import datetime, timezone
+from functools import lru_cache
+import numpy as np
+from weather_cache import LOADERS, TTLS, points_key, weather_cache
+from weather_support import NWS_API_BASE, make_nws_request
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+GRIDPOINT_TTL_SECONDS = float(os.environ.get("GRIDPOINT_TTL_SECONDS", "3600"))
+# Upper bound on gridpoints analysed in one call
+MAX_GRIDPOINTS_PER_CALL = int(os.environ.get("MAX_GRIDPOINTS_PER_CALL", "50"))
+# NWS publishes roughly seven days of gridpoint data
+MAX_WINDOW_HOURS = 24 * 8
+
+AGGREGATIONS = {
+    "min": np.nanmin,
+    "max": np.nanmax,
+    "mean": np.nanmean,
+    "sum": np.nansum,
+}
+DEFAULT_AGGREGATIONS = ("min", "max", "mean")
+
+GRIDPOINT_PATTERN = re.compile(r"^([A-Z]{3})/(\d+),(\d+)$")
+DURATION_PATTERN = re.compile(r"^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?$")
+
+
+# --- Decoding ---
+class LayerSeries:
+    """
+    One gridpoint layer expanded to an hourly series.
+
+    `hours` are whole hours since the Unix epoch (UTC) as int64, `values`
+    the matching float64 values with NaN where NWS reported null.
+    """
+    __slots__ = ("hours", "values", "unit")
+
+    def __init__(self, hours: np.ndarray, values: np.ndarray, unit: str | None):
+        self.hours = hours
+        self.values = values
+        self.unit = unit
+
+
+@lru_cache(maxsize=256)
+def _duration_hours(duration: str) -> int:
+    """Parses an ISO-8601 duration such as PT3H or P1DT6H into whole hours."""
+    match = DURATION_PATTERN.match(duration)
+    if not match:
+        raise ValueError(f"Unsupported duration: {duration}")
+    days, hours, minutes = (int(part) if part else 0 for part in match.groups())
+    return max(1, days * 24 + hours + (1 if minutes else 0))
+
+
+def _epoch_hours(starts: list[str]) -> np.ndarray:
+    """Converts ISO-8601 start times to hours since the epoch."""
+    if all(start.endswith("+00:00") for start in starts):
+        # NWS reports UTC; numpy parses the naive part in one call
+        naive = np.array([start[:-6] for start in starts], dtype="datetime64[h]")
+        return naive.astype(np.int64)
+    return np.array(
+        [int(datetime.fromisoformat(start).timestamp() // 3600) for start in starts],
+        dtype=np.int64,
+    )
+
+
+def _is_numeric(value) -> bool:
+    return value is None or (
+        isinstance(value, (int, float)) and not isinstance(value, bool)
+    )
+
+
+def _is_numeric_layer(layer: dict) -> bool:
+    """
+    True for layers whose values are all numbers or null. Layers such as
+    `weather` and `hazards` hold lists of dicts and are not series.
+    """
+    return all(_is_numeric(entry.get("value")) for entry in layer.get("values", []))
+
+
+def decode_layer(layer: dict) -> LayerSeries:
+    """
+    Expands an NWS layer of {validTime: "start/duration", value} intervals.
+
+    Raises TypeError if the layer holds non-numeric values.
+    """
+    entries = layer.get("values", [])
+    if not _is_numeric_layer(layer):
+        raise TypeError("Layer values are not numeric")
+    if not entries:
+        empty = np.empty(0)
+        return LayerSeries(empty.astype(np.int64), empty, layer.get("uom"))
+    starts, durations = zip(*(entry["validTime"].split("/") for entry in entries))
+    start_hours = _epoch_hours(list(starts))
+    counts = np.array(
+        [_duration_hours(duration) for duration in durations], dtype=np.int64
+    )
+    values = np.array(
+        [np.nan if entry["value"] is None else entry["value"] for entry in entries],
+        dtype=np.float64,
+    )
+    # Each interval becomes `count` consecutive hours starting at its start time
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return LayerSeries(
+        np.repeat(start_hours, counts) + offsets,
+        np.repeat(values, counts),
+        layer.get("uom"),
+    )
+
+
+def decode_gridpoint(data: dict) -> dict[str, LayerSeries]:
+    """Decodes every time-series layer of a /gridpoints/{office}/{x},{y} response."""
+    layers = {}
+    for name, layer in data.get("properties", {}).items():
+        if not isinstance(layer, dict) or not isinstance(layer.get("values"), list):
+            continue
+        if not _is_numeric_layer(layer):
+            logger.debug(f"Skipping non-numeric gridpoint layer {name}")
+            continue
+        try:
+            layers[name] = decode_layer(layer)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Skipping undecodable gridpoint layer {name}: {e}")
+    return layers
+
+
+# --- Cache Integration ---
+def gridpoint_key(gridpoint: str) -> tuple[str, str]:
+    return ("gridpoint", gridpoint)
+
+
+async def _load_gridpoint(gridpoint: str):
+    office, x, y = GRIDPOINT_PATTERN.match(gridpoint).groups()
+    data = await make_nws_request(f"{NWS_API_BASE}/gridpoints/{office}/{x},{y}")
+    if not data:
+        return None
+    return decode_gridpoint(data)
+
+
+# Decoded arrays are cached per gridpoint, so repeated queries do no parsing
+LOADERS["gridpoint"] = _load_gridpoint
+TTLS["gridpoint"] = GRIDPOINT_TTL_SECONDS
+
+
+async def resolve_gridpoint(location: str) -> str | None:
+    """
+    Returns the "OFFICE/X,Y" gridpoint for either a gridpoint string or a
+    "latitude,longitude" pair, or None if it cannot be resolved.
+    """
+    location = location.strip().upper()
+    if GRIDPOINT_PATTERN.match(location):
+        return location
+    try:
+        latitude, longitude = (float(part) for part in location.split(","))
+    except ValueError:
+        return None
+    gridpoint = await weather_cache.get(points_key(latitude, longitude))
+    if not gridpoint or gridpoint.office is None:
+        return None
+    return gridpoint.name
+
+
+# --- Analytics ---
+def call_cost(locations: list[str]) -> int:
+    """
+    Quota cost of one analysis: a token per location, since each location
+    may take a /points and a /gridpoints request upstream.
+    """
+    return max(1, min(len(locations), MAX_GRIDPOINTS_PER_CALL))
+
+
+def _to_list(values: np.ndarray) -> list[float | None]:
+    return [None if np.isnan(value) else round(float(value), 3) for value in values]
+
+
+def _aggregate(matrix: np.ndarray, aggregation: str, axis: int) -> np.ndarray:
+    with warnings.catch_warnings():
+        # All-NaN rows (no data in the window) legitimately yield NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        result = AGGREGATIONS[aggregation](matrix, axis=axis)
+    if aggregation == "sum":
+        # nansum returns 0 for all-NaN rows; report those as missing instead
+        result = np.where(np.isnan(matrix).all(axis=axis), np.nan, result)
+    return result
+
+
+def window_matrix(
+    series: list[LayerSeries | None], start: int, hours: int
+) -> np.ndarray:
+    """Aligns many gridpoint series on one hourly window, NaN where missing."""
+    matrix = np.full((len(series), hours), np.nan)
+    for row, layer in enumerate(series):
+        if layer is None:
+            continue
+        index = layer.hours - start
+        inside = (index >= 0) & (index < hours)
+        matrix[row, index[inside]] = layer.values[inside]
+    return matrix
+
+
+def analyze_matrix(
+    matrix: np.ndarray,
+    aggregations: tuple[str, ...] = DEFAULT_AGGREGATIONS,
+    below: float | None = None,
+    above: float | None = None,
+    resample_hours: int | None = None,
+) -> dict[str, list]:
+    """Computes per-row aggregations, threshold counts and resampled series."""
+    results: dict[str, list] = {
+        name: _to_list(_aggregate(matrix, name, axis=1)) for name in aggregations
+    }
+    valid = ~np.isnan(matrix)
+    results["hours_with_data"] = valid.sum(axis=1).tolist()
+    if below is not None:
+        results["hours_below"] = (matrix < below).sum(axis=1).tolist()
+    if above is not None:
+        results["hours_above"] = (matrix > above).sum(axis=1).tolist()
+    if resample_hours:
+        rows, hours = matrix.shape
+        buckets = -(-hours // resample_hours)
+        padded = np.full((rows, buckets * resample_hours), np.nan)
+        padded[:, :hours] = matrix
+        blocks = padded.reshape(rows, buckets, resample_hours)
+        for name in aggregations:
+            resampled = _aggregate(blocks, name, axis=2)
+            results[f"{name}_{resample_hours}h"] = [_to_list(row) for row in resampled]
+    return results
+
+
+def _hour_to_iso(hour: int) -> str:
+    return datetime.fromtimestamp(hour * 3600, timezone.utc).isoformat()
+
+
+def _parse_start(start: str | None) -> int:
+    if start is None:
+        return int(datetime.now(timezone.utc).timestamp() // 3600)
+    moment = datetime.fromisoformat(start)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() // 3600)
+
+
+async def analyze_gridpoints(
+    locations: list[str],
+    layer: str = "temperature",
+    hours: int = 72,
+    aggregations: list[str] | None = None,
+    below: float | None = None,
+    above: float | None = None,
+    resample_hours: int | None = None,
+    start: str | None = None,
+) -> dict:
+    """
+    Fetches (or reuses) decoded gridpoint series for many locations and
+    analyses one layer over an hourly window in a single vectorised pass.
+
+    Raises ValueError for invalid arguments.
+    """
+    aggregations = tuple(aggregations or DEFAULT_AGGREGATIONS)
+    unknown = [name for name in aggregations if name not in AGGREGATIONS]
+    if unknown:
+        raise ValueError(
+            f"Unknown aggregations {unknown}; choose from {list(AGGREGATIONS)}"
+        )
+    if not locations:
+        raise ValueError("Provide at least one location.")
+    if len(locations) > MAX_GRIDPOINTS_PER_CALL:
+        raise ValueError(f"At most {MAX_GRIDPOINTS_PER_CALL} locations per call.")
+    if not 1 <= hours <= MAX_WINDOW_HOURS:
+        raise ValueError(f"hours must be between 1 and {MAX_WINDOW_HOURS}.")
+    if resample_hours is not None and not 1 <= resample_hours <= hours:
+        raise ValueError("resample_hours must be between 1 and hours.")
+    window_start = _parse_start(start)
+
+    gridpoints = await asyncio.gather(
+        *(resolve_gridpoint(location) for location in locations)
+    )
+
+    async def fetch(gridpoint: str | None):
+        return await weather_cache.get(gridpoint_key(gridpoint)) if gridpoint else None
+
+    decoded_gridpoints = await asyncio.gather(
+        *(fetch(gridpoint) for gridpoint in gridpoints)
+    )
+    series: list[LayerSeries | None] = []
+    errors = []
+    for location, decoded in zip(locations, decoded_gridpoints):
+        if decoded is None:
+            errors.append(f"{location}: unable to fetch gridpoint data")
+        elif layer not in decoded:
+            errors.append(f"{location}: layer '{layer}' not available")
+            decoded = None
+        series.append(decoded[layer] if decoded else None)
+
+    results = analyze_matrix(
+        window_matrix(series, window_start, hours),
+        aggregations, below, above, resample_hours,
+    )
+    rows = []
+    rows_by_location = zip(locations, gridpoints, series)
+    for row, (location, gridpoint, layer_series) in enumerate(rows_by_location):
+        if layer_series is None:
+            continue
+        rows.append({
+            "location": location,
+            "gridpoint": gridpoint,
+            "unit": layer_series.unit,
+            **{name: values[row] for name, values in results.items()},
+        })
+    logger.info(f"Analysed layer {layer} for {len(rows)} of {len(locations)} locations")
+    return {
+        "layer": layer,
+        "start": _hour_to_iso(window_start),
+        "hours": hours,
+        "resample_hours": resample_hours,
+        "gridpoints": rows,
+        "errors": errors,
+    }
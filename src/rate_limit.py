@@ -0,0 +1,358 @@
+# src/rate_limit.py
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Annotated, NamedTuple
+from fastapi import Depends, HTTPException, Request, status
+from mcp.server.fastmcp.exceptions import ToolError
+from auth import get_current_user
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Sustained requests per second allowed for each client
+RATE_LIMIT_RATE = float(os.environ.get("RATE_LIMIT_RATE", "5"))
+# Maximum burst of requests a client may make after being idle
+RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", "20"))
+# Clients idle for longer than this are forgotten
+RATE_LIMIT_IDLE_SECONDS = float(os.environ.get("RATE_LIMIT_IDLE_SECONDS", "300"))
+# Maximum number of NWS requests in flight at the same time
+UPSTREAM_CONCURRENCY = int(os.environ.get("UPSTREAM_CONCURRENCY", "8"))
+# Optional per-client scheduling weights, e.g. "user:alice=2,ip:10.0.0.5=0.5"
+CLIENT_WEIGHTS = {
+    key.strip(): float(weight)
+    for key, _, weight in (
+        item.partition("=")
+        for item in os.environ.get("CLIENT_WEIGHTS", "").split(",")
+        if "=" in item
+    )
+}
+# Issued API keys as "name=key" pairs, e.g. "reporting=3f9a...,ops=81bc...".
+# Only keys listed here are trusted; unknown X-API-Key headers are ignored.
+API_KEYS = {
+    hashlib.sha256(key.strip().encode()).hexdigest(): name.strip()
+    for name, _, key in (
+        item.partition("=")
+        for item in os.environ.get("API_KEYS", "").split(",")
+        if "=" in item
+    )
+}
+
+
+# --- Client Identity ---
+class ClientIdentity(NamedTuple):
+    """Who a request is accounted to, and through which transport it arrived."""
+    key: str
+    weight: float = 1.0
+    source: str = "rest"  # "rest" or "mcp"
+
+
+# Set per REST request and per MCP SSE session; read by the tools and the
+# upstream scheduler. Tasks spawned by the MCP server inherit it.
+current_client: ContextVar[ClientIdentity | None] = ContextVar(
+    "current_client", default=None
+)
+
+
+def lookup_api_key(api_key: str | None) -> str | None:
+    """Returns the name an API key was issued under, or None if it is unknown."""
+    if not api_key:
+        return None
+    # Only digests are stored, so the configured keys are not kept in memory
+    return API_KEYS.get(hashlib.sha256(api_key.encode()).hexdigest())
+
+
+def make_client_identity(
+    api_key: str | None = None,
+    user: dict | None = None,
+    ip: str | None = None,
+    source: str = "rest",
+) -> ClientIdentity:
+    """
+    Builds a client identity from a configured API key, a token subject or
+    an IP, in that order. Unrecognised API keys are ignored, so a client
+    cannot obtain a fresh quota by inventing keys.
+    """
+    key_name = lookup_api_key(api_key)
+    if key_name:
+        key = f"key:{key_name}"
+    elif user and user.get("username"):
+        key = f"user:{user['username']}"
+    else:
+        key = f"ip:{ip or 'unknown'}"
+    return ClientIdentity(key, CLIENT_WEIGHTS.get(key, 1.0), source)
+
+
+# --- Token Bucket Rate Limiter ---
+class TokenBucket:
+    """A single client's bucket: two floats, refilled lazily on access."""
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """
+    Per-client token bucket limiter.
+
+    Uses O(1) memory per active client. Buckets are kept in least-recently-used
+    order, so idle clients are evicted from the front in amortised O(1).
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_RATE,
+        burst: float = RATE_LIMIT_BURST,
+        idle_seconds: float = RATE_LIMIT_IDLE_SECONDS,
+    ):
+        self.rate = rate
+        self.burst = burst
+        # An idle bucket is only safe to drop once it would have refilled
+        self.idle_seconds = max(idle_seconds, burst / rate if rate > 0 else 0)
+        self._buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """
+        Takes `cost` tokens from the client's bucket.
+
+        Returns 0 if the request is allowed, otherwise the number of seconds
+        until enough tokens will be available.
+        """
+        now = time.monotonic()
+        self._evict_idle(now)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.burst, now)
+        else:
+            bucket.tokens = min(
+                self.burst, bucket.tokens + (now - bucket.updated) * self.rate
+            )
+            bucket.updated = now
+            self._buckets.move_to_end(key)
+
+        # A request costing more than the burst is admitted from a full bucket
+        # and leaves it in debt, which is then repaid at `rate`
+        needed = min(cost, self.burst)
+        if bucket.tokens >= needed:
+            bucket.tokens -= cost
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (needed - bucket.tokens) / self.rate
+
+    def _evict_idle(self, now: float) -> None:
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            idle = now - bucket.updated
+            if idle < self.idle_seconds:
+                break
+            if self.rate > 0 and bucket.tokens + idle * self.rate < self.burst:
+                # Still repaying a large request; dropping it would forgive the debt
+                break
+            del self._buckets[key]
+            logger.debug(f"Evicted idle rate limit bucket for {key}")
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+rate_limiter = RateLimiter()
+
+
+def _retry_after(wait: float) -> str:
+    return str(max(1, math.ceil(wait))) if math.isfinite(wait) else "3600"
+
+
+async def identify_client(
+    request: Request,
+    current_user: Annotated[dict, Depends(get_current_user)],
+) -> ClientIdentity:
+    """
+    Dependency for REST routes: authenticates and records the client for
+    upstream scheduling without charging its quota. Routes whose cost depends
+    on their arguments use this and then call `charge_rate_limit`.
+    """
+    identity = make_client_identity(
+        api_key=request.headers.get("X-API-Key"),
+        user=current_user,
+        ip=request.client.host if request.client else None,
+    )
+    current_client.set(identity)
+    return identity
+
+
+def charge_rate_limit(identity: ClientIdentity, cost: float = 1.0) -> None:
+    """
+    Charges `cost` tokens to a REST client's quota.
+    Raises HTTPException 429 with a Retry-After header when over quota.
+    """
+    wait = rate_limiter.acquire(identity.key, cost)
+    if wait > 0:
+        logger.warning(f"Rate limit exceeded for {identity.key}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": _retry_after(wait)},
+        )
+
+
+async def enforce_rate_limit(
+    identity: Annotated[ClientIdentity, Depends(identify_client)],
+) -> ClientIdentity:
+    """
+    Dependency for REST routes: authenticates, charges the client's quota and
+    records the client for upstream scheduling.
+    Raises HTTPException 429 with a Retry-After header when over quota.
+    """
+    charge_rate_limit(identity)
+    return identity
+
+
+async def enforce_ip_rate_limit(request: Request) -> ClientIdentity:
+    """
+    Dependency for unauthenticated REST routes such as /token: charges the
+    quota of the client's IP, so login attempts cannot bypass the limiter.
+    Raises HTTPException 429 with a Retry-After header when over quota.
+    """
+    identity = make_client_identity(
+        ip=request.client.host if request.client else None
+    )
+    charge_rate_limit(identity)
+    return identity
+
+
+def enforce_tool_rate_limit(cost: float = 1.0) -> None:
+    """
+    Charges `cost` tokens to the quota of the MCP client calling a tool.
+    Raises ToolError, which MCP reports to the client as a tool error.
+
+    REST calls are charged by `enforce_rate_limit` instead, so this only
+    applies to tools invoked through an MCP session.
+    """
+    identity = current_client.get()
+    if identity is None or identity.source != "mcp":
+        return
+    wait = rate_limiter.acquire(identity.key, cost)
+    if wait > 0:
+        logger.warning(f"Tool rate limit exceeded for {identity.key}")
+        raise ToolError(
+            f"Rate limit exceeded. Retry after {_retry_after(wait)} seconds."
+        )
+
+
+# --- Weighted Fair Upstream Scheduling ---
+class FairScheduler:
+    """
+    Weighted fair queuing of upstream requests across clients.
+
+    At most `concurrency` requests run at once. When all slots are busy,
+    waiters are tagged with a virtual finish time and served lowest tag
+    first (self-clocked fair queuing): a tag is the later of the virtual
+    time and the client's previous tag, plus 1 / weight, and virtual time
+    advances to the tag of each request dispatched. A client looping on one
+    tool therefore cannot starve the others: each client gets slots in
+    proportion to its weight. Per-client state is one float and is dropped
+    as soon as it can no longer affect ordering.
+    """
+
+    def __init__(self, concurrency: int = UPSTREAM_CONCURRENCY):
+        self.concurrency = concurrency
+        self._active = 0
+        self._virtual_time = 0.0
+        self._last_finish: dict[str, float] = {}
+        self._pending: dict[str, int] = {}
+        self._queue: list[tuple[float, int, str, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        # Queued tasks, so a waiting request can be promoted
+        self._waiters: dict[asyncio.Task, tuple[float, str, asyncio.Future]] = {}
+
+    @asynccontextmanager
+    async def slot(self, identity: ClientIdentity | None = None):
+        """Holds one upstream slot for the duration of the block."""
+        identity = identity or current_client.get() or ClientIdentity("anonymous")
+        await self._acquire(identity)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, identity: ClientIdentity) -> None:
+        if self._active < self.concurrency and not self._queue:
+            self._active += 1
+            return
+
+        key = identity.key
+        start = max(self._virtual_time, self._last_finish.get(key, 0.0))
+        finish = start + 1.0 / max(identity.weight, 1e-6)
+        self._last_finish[key] = finish
+        self._pending[key] = self._pending.get(key, 0) + 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (finish, next(self._sequence), key, future))
+        task = asyncio.current_task()
+        self._waiters[task] = (finish, key, future)
+        logger.debug(f"Queued upstream request for {key} (virtual finish {finish:.2f})")
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before cancellation; pass it on
+                self._release()
+            raise
+        finally:
+            del self._waiters[task]
+            self._forget(key)
+
+    def promote(self, task: asyncio.Task, identity: ClientIdentity) -> None:
+        """
+        Lets a task's queued request wait no longer than it would if `identity`
+        had queued it. Used when a client joins a fetch started by someone with
+        a lower weight; the client is not charged for it.
+        """
+        waiter = self._waiters.get(task)
+        if waiter is None:
+            return
+        finish, key, future = waiter
+        start = max(self._virtual_time, self._last_finish.get(identity.key, 0.0))
+        promoted = start + 1.0 / max(identity.weight, 1e-6)
+        if promoted < finish:
+            # The old entry stays queued and is skipped once the future is done
+            heapq.heappush(self._queue, (promoted, next(self._sequence), key, future))
+            self._waiters[task] = (promoted, key, future)
+            logger.debug(
+                f"Promoted upstream request for {key} on behalf of {identity.key}"
+            )
+
+    def _release(self) -> None:
+        while self._queue:
+            finish, _, _, future = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            self._virtual_time = finish
+            future.set_result(None)
+            return
+        self._active -= 1
+
+    def _forget(self, key: str) -> None:
+        remaining = self._pending[key] - 1
+        if remaining:
+            self._pending[key] = remaining
+            return
+        # With nothing queued, the client's next tag starts from virtual time
+        # anyway, so its state can be dropped
+        del self._pending[key]
+        del self._last_finish[key]
+
+
+upstream_scheduler = FairScheduler()
@@ -3,9 +3,17 @@
 import logging
 from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi import APIRouter, Depends, HTTPException, status # Import necessary modules
-# from fastapi.security import OAuth2PasswordRequestForm
+from fastapi import status as http_status
+from fastapi.security import OAuth2PasswordRequestForm
+from typing import Annotated
 from weather_app import app
-# Authentication removed: auth.py no longer exists
+from auth import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    authenticate_user,
+    create_access_token,
+    get_current_user,
+)
+from rate_limit import ClientIdentity, enforce_ip_rate_limit
 from datetime import timedelta
 
 # Configure logging for this module
@@ -48,10 +56,37 @@ async def status():
     }
     return JSONResponse(status_info)
 
-# Authentication endpoints removed: auth.py no longer exists
+# --- Authentication Endpoints ---
+@router.post("/token", tags=["Auth"], summary="Obtain a Bearer token")
+async def login_for_access_token(
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+    client: Annotated[ClientIdentity, Depends(enforce_ip_rate_limit)],
+):
+    """
+    Exchange a username and password for a JWT access token.
+    Attempts are rate limited per IP, as no token identifies the client yet.
+    """
+    logger.info(f"Token requested for user: {form_data.username}")
+    # Password hashing runs in the bcrypt thread pool, not on the event loop
+    user = await authenticate_user(form_data.username, form_data.password)
+    if not user:
+        raise HTTPException(
+            # `status` is shadowed by the /status handler below, hence the alias
+            status_code=http_status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    access_token = create_access_token(
+        data={"sub": user["username"], "roles": user["roles"]},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
 
 # --- Example Protected Endpoint ---
-# Protected endpoint removed: auth.py and authentication no longer exist
+@router.get("/users/me", tags=["Auth"], summary="Current user")
+async def read_users_me(current_user: Annotated[dict, Depends(get_current_user)]):
+    """Returns the authenticated user's details."""
+    return current_user
 
 # --- Example Role-Restricted Endpoint ---
 # @router.get("/admin-only", tags=["Admin"], summary="Admin-only endpoint")
@@ -1,8 +1,15 @@
 # 
 
 import logging
+from typing import Literal
 from mcp.server.fastmcp import FastMCP
-from weather_support import make_nws_request, format_alert
+from mcp.server.fastmcp.exceptions import ToolError
+from weather_support import render_alert, render_forecast_period
+from weather_cache import weather_cache, alerts_key, points_key, forecast_key
+from weather_models import Alert, ForecastPeriod, GridpointRef
+from weather_schemas import AlertsOut, ForecastOut
+from rate_limit import enforce_tool_rate_limit
+import gridpoint_analytics
 
 
 # Configure logging for this module
@@ -12,78 +19,152 @@ logger = logging.getLogger(__name__)
 # Initialize FastMCP server
 mcp = FastMCP("weather")
 
+# Number of forecast periods returned by get_forecast
+FORECAST_PERIODS = 5
 
-# Constants
-NWS_API_BASE = "https://api.weather.gov"
 
+class WeatherDataError(Exception):
+    """Raised when the NWS data needed for a request cannot be fetched."""
 
 
+# --- Data Access ---
+async def fetch_alerts(state: str) -> list[Alert]:
+    """Returns the active alerts for a state, served from the cache."""
+    # Hot states are refreshed ahead of expiry
+    alerts = await weather_cache.get(alerts_key(state))
+    if alerts is None:
+        logger.warning(f"No data or features for state: {state}")
+        raise WeatherDataError("Unable to fetch alerts or no alerts found.")
+    return alerts
+
+
+async def fetch_forecast(
+    latitude: float, longitude: float
+) -> tuple[GridpointRef, list[ForecastPeriod]]:
+    """Returns the gridpoint and upcoming forecast periods for a location."""
+    # First get the forecast grid endpoint
+    gridpoint = await weather_cache.get(points_key(latitude, longitude))
+    if not gridpoint or not gridpoint.forecast_url:
+        logger.warning(f"No points data for lat={latitude}, lon={longitude}")
+        raise WeatherDataError("Unable to fetch forecast data for this location.")
+
+    periods = await weather_cache.get(forecast_key(gridpoint.forecast_url))
+    if periods is None:
+        logger.warning(f"No forecast data for lat={latitude}, lon={longitude}")
+        raise WeatherDataError("Unable to fetch detailed forecast.")
+    return gridpoint, periods[:FORECAST_PERIODS]
+
 
+def alerts_text(state: str, alerts: list[Alert]) -> str:
+    """Readable alerts, shared by the MCP tool and the REST route."""
+    if not alerts:
+        logger.info(f"No active alerts for state: {state}")
+        return "No active alerts for this state."
+
+    # Each alert version is formatted once and reused across calls
+    rendered = [render_alert(alert) for alert in alerts]
+    logger.debug(f"Returning {len(rendered)} alerts for state: {state}")
+    return "\n---\n".join(rendered)
+
+
+def forecast_text(
+    latitude: float, longitude: float, periods: list[ForecastPeriod]
+) -> str:
+    """Readable forecast, shared by the MCP tool and the REST route."""
+    # Format the periods into a readable forecast
+    forecasts = [render_forecast_period(period) for period in periods]
+    logger.info(
+        f"Returning {len(forecasts)} forecast periods for "
+        f"lat={latitude}, lon={longitude}"
+    )
+    return "\n---\n".join(forecasts)
 
+
+# --- MCP Tools ---
 @mcp.tool()
-async def get_alerts(state: str) -> str:
+async def get_alerts(state: str, format: Literal["text", "json"] = "text") -> str:
     """Get weather alerts for a US state.
 
     Args:
         state: Two-letter US state code (e.g. CA, NY)
+        format: "text" for readable alerts (default) or "json" for structured fields
     """
     logger.info(f"get_alerts called with state: {state}")
-    url = f"{NWS_API_BASE}/alerts/active/area/{state}"
-    data = await make_nws_request(url)
+    enforce_tool_rate_limit()
+    try:
+        alerts = await fetch_alerts(state)
+    except WeatherDataError as e:
+        if format == "json":
+            raise ToolError(str(e))
+        return str(e)
 
-    if not data or "features" not in data:
-        logger.warning(f"No data or features for state: {state}")
-        return "Unable to fetch alerts or no alerts found."
-
-    if not data["features"]:
-        logger.info(f"No active alerts for state: {state}")
-        return "No active alerts for this state."
-
-    alerts = [format_alert(feature) for feature in data["features"]]
-    logger.debug(f"Returning {len(alerts)} alerts for state: {state}")
-    return "\n---\n".join(alerts)
+    if format == "json":
+        return AlertsOut.from_records(state, alerts).model_dump_json()
+    return alerts_text(state, alerts)
 
 
 @mcp.tool()
-async def get_forecast(latitude: float, longitude: float) -> str:
+async def get_forecast(
+    latitude: float, longitude: float, format: Literal["text", "json"] = "text"
+) -> str:
     """Get weather forecast for a location.
 
     Args:
         latitude: Latitude of the location
         longitude: Longitude of the location
+        format: "text" for a readable forecast (default) or "json" for structured fields
     """
     logger.info(f"get_forecast called with latitude={latitude}, longitude={longitude}")
-    # First get the forecast grid endpoint
-    points_url = f"{NWS_API_BASE}/points/{latitude},{longitude}"
-    points_data = await make_nws_request(points_url)
+    enforce_tool_rate_limit()
+    try:
+        gridpoint, periods = await fetch_forecast(latitude, longitude)
+    except WeatherDataError as e:
+        if format == "json":
+            raise ToolError(str(e))
+        return str(e)
 
-    if not points_data:
-        logger.warning(f"No points data for lat={latitude}, lon={longitude}")
-        return "Unable to fetch forecast data for this location."
+    if format == "json":
+        return ForecastOut.from_records(
+            latitude, longitude, gridpoint.name, periods
+        ).model_dump_json()
+    return forecast_text(latitude, longitude, periods)
 
-    # Get the forecast URL from the points response
-    forecast_url = points_data["properties"]["forecast"]
-    forecast_data = await make_nws_request(forecast_url)
 
-    if not forecast_data:
-        logger.warning(f"No forecast data for lat={latitude}, lon={longitude}")
-        return "Unable to fetch detailed forecast."
+@mcp.tool()
+async def analyze_gridpoints(
+    locations: list[str],
+    layer: str = "temperature",
+    hours: int = 72,
+    aggregations: list[str] | None = None,
+    below: float | None = None,
+    above: float | None = None,
+    resample_hours: int | None = None,
+    start: str | None = None,
+) -> dict:
+    """Analyse raw hourly gridpoint forecast data for one or more locations.
+
+    Answers questions like "max wind over the next 72h" or "hours below
+    freezing" for many places in one call. Values are in the units NWS
+    reports, given per result (e.g. wmoUnit:degC, wmoUnit:km_h-1).
 
-    # Format the periods into a readable forecast
-    periods = forecast_data["properties"]["periods"]
-    forecasts = []
-    for period in periods[:5]:  # Only show next 5 periods
-        logger.debug(f"Formatting forecast period: {period.get('name', 'N/A')}")
-        forecast = f"""
-{period['name']}:
-Temperature: {period['temperature']}°{period['temperatureUnit']}
-Wind: {period['windSpeed']} {period['windDirection']}
-Forecast: {period['detailedForecast']}
-"""
-        forecasts.append(forecast)
-
-    logger.info(f"Returning {len(forecasts)} forecast periods for lat={latitude}, lon={longitude}")
-    return "\n---\n".join(forecasts)
+    Args:
+        locations: Gridpoints ("STO/41,68") or "latitude,longitude" pairs
+        layer: Gridpoint layer, e.g. temperature, windSpeed, windGust,
+            probabilityOfPrecipitation, quantitativePrecipitation, skyCover
+        hours: Length of the window in hours (default 72)
+        aggregations: Any of min, max, mean, sum (default min, max, mean)
+        below: Count hours with values below this threshold (e.g. 0 for freezing)
+        above: Count hours with values above this threshold
+        resample_hours: Also return the aggregations per block of this many hours
+        start: ISO-8601 start of the window (default: the current hour, UTC)
+    """
+    logger.info(
+        f"analyze_gridpoints called for {len(locations)} locations, layer={layer}"
+    )
+    enforce_tool_rate_limit(cost=gridpoint_analytics.call_cost(locations))
+    return await gridpoint_analytics.analyze_gridpoints(
+        locations, layer, hours, aggregations, below, above, resample_hours, start
+    )
 
 
 if __name__ == "__main__":
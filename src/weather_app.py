@@ -1,9 +1,35 @@
 import logging
-from fastapi import FastAPI, Request
+import re
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Depends, HTTPException
 from mcp.server.sse import SseServerTransport
+from starlette.requests import Request as StarletteRequest
+from starlette.responses import JSONResponse, PlainTextResponse
 from starlette.routing import Mount
-from weather import mcp, get_alerts, get_forecast
+from starlette.types import Receive, Scope, Send
+from typing import Literal
+from weather import (
+    mcp,
+    analyze_gridpoints,
+    alerts_text,
+    forecast_text,
+    fetch_alerts,
+    fetch_forecast,
+    WeatherDataError,
+)
+from weather_schemas import AlertsOut, ForecastOut, FastJSONResponse
+from gridpoint_analytics import call_cost
 from fastapi import Query
+from auth import get_current_user, bind_session, unbind_session, get_session_user
+from weather_cache import prefetch_scheduler
+from rate_limit import (
+    ClientIdentity,
+    charge_rate_limit,
+    current_client,
+    enforce_rate_limit,
+    identify_client,
+    make_client_identity,
+)
 
 
 
@@ -40,20 +66,54 @@ root_logger.addHandler(console_handler)
 
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Keeps popular alert and forecast cache entries warm while the app runs."""
+    prefetch_scheduler.start()
+    try:
+        yield
+    finally:
+        await prefetch_scheduler.stop()
+
+
 # Create FastAPI application with metadata
 app = FastAPI(
     title="FastAPI MCP SSE",
     description="A demonstration of Server-Sent Events with Model Context "
     "Protocol integration",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 
 # Create SSE transport instance for handling server-sent events
 sse = SseServerTransport("/messages/")
 
+# Matches the session id in the "endpoint" event the transport sends first
+SESSION_ID_PATTERN = re.compile(rb"session_id=([0-9a-f]{32})")
+
+
+async def handle_messages(scope: Scope, receive: Receive, send: Send):
+    """
+    Accept posted MCP messages only for sessions opened by an authenticated /sse.
+
+    The session id is bound to the user when the SSE stream is established,
+    so no token is decoded here.
+    """
+    request = StarletteRequest(scope, receive)
+    if get_session_user(request.query_params.get("session_id")) is None:
+        logger.warning("Rejected message for unknown or unauthenticated session")
+        response = JSONResponse(
+            {"detail": "Could not validate session"},
+            status_code=401,
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        return await response(scope, receive, send)
+    await sse.handle_post_message(scope, receive, send)
+
+
 # Mount the /messages path to handle SSE message posting
-app.router.routes.append(Mount("/messages", app=sse.handle_post_message))
+app.router.routes.append(Mount("/messages", app=handle_messages))
 
 
 # Add documentation for the /messages endpoint
@@ -63,6 +123,7 @@ def messages_docs():
     Messages endpoint for SSE communication
 
     This endpoint is used for posting messages to SSE clients.
+    Posting requires the session id of an authenticated /sse connection.
     Note: This route is for documentation purposes only.
     The actual implementation is handled by the SSE transport.
     """
@@ -70,44 +131,148 @@ def messages_docs():
 
 
 @app.get("/sse", tags=["MCP"])
-async def handle_sse(request: Request):
+async def handle_sse(request: Request, current_user: dict = Depends(get_current_user)):
     """
     SSE endpoint that connects to the MCP server
 
     This endpoint establishes a Server-Sent Events connection with the client
     and forwards communication to the Model Context Protocol server.
+    Requires a Bearer token; the resulting MCP session is bound to the user.
+    Tool calls in the session are rate limited against the same client.
     """
-    # Use sse.connect_sse to establish an SSE connection with the MCP server
-    async with sse.connect_sse(request.scope, request.receive, request._send) as (
-        read_stream,
-        write_stream,
-    ):
-        # Run the MCP server with the established streams
-        await mcp._mcp_server.run(
+    # Inherited by the MCP server's tasks, so tool calls know their client
+    current_client.set(make_client_identity(
+        api_key=request.headers.get("X-API-Key"),
+        user=current_user,
+        ip=request.client.host if request.client else None,
+        source="mcp",
+    ))
+    session_ids: list[str] = []
+    send = request._send
+
+    async def send_and_bind(message):
+        # The first body chunk is the "endpoint" event carrying the session id
+        if not session_ids and message["type"] == "http.response.body":
+            match = SESSION_ID_PATTERN.search(message.get("body", b""))
+            if match:
+                session_ids.append(match.group(1).decode())
+                bind_session(session_ids[0], current_user)
+        await send(message)
+
+    try:
+        # Use sse.connect_sse to establish an SSE connection with the MCP server
+        async with sse.connect_sse(request.scope, request.receive, send_and_bind) as (
             read_stream,
             write_stream,
-            mcp._mcp_server.create_initialization_options(),
-        )
-        logger.info("SSE connection established with client")
-
+        ):
+            # Run the MCP server with the established streams
+            await mcp._mcp_server.run(
+                read_stream,
+                write_stream,
+                mcp._mcp_server.create_initialization_options(),
+            )
+            logger.info("SSE connection established with client")
+    finally:
+        for session_id in session_ids:
+            unbind_session(session_id)
+
+
+# Weather routes return FastJSONResponse directly, so their JSON is encoded
+# by pydantic-core instead of FastAPI's jsonable_encoder + json.dumps path.
+# response_model and responses only describe both formats in OpenAPI.
+# The text format keeps the routes' original contract: the readable text, or
+# the error message, as a JSON string with status 200.
+WEATHER_RESPONSES = {
+    200: {"description": "A JSON string, or structured fields with format=json"},
+    502: {"description": "NWS data could not be fetched (format=json only)"},
+}
+FORMAT_QUERY = Query("text", description="Readable text or structured JSON")
 
 # REST endpoint for get_alerts
-@app.get("/get_alerts", tags=["Weather"])
-async def rest_get_alerts(state: str = Query(..., description="Two-letter US state code (e.g. CA, NY)")):
+@app.get(
+    "/get_alerts",
+    tags=["Weather"],
+    response_model=AlertsOut,
+    responses=WEATHER_RESPONSES,
+)
+async def rest_get_alerts(
+    state: str = Query(..., description="Two-letter US state code (e.g. CA, NY)"),
+    format: Literal["text", "json"] = FORMAT_QUERY,
+    client: ClientIdentity = Depends(enforce_rate_limit),
+):
     """REST endpoint to get weather alerts for a US state."""
-    return await get_alerts(state)
+    try:
+        alerts = await fetch_alerts(state)
+    except WeatherDataError as e:
+        if format == "json":
+            raise HTTPException(status_code=502, detail=str(e))
+        return FastJSONResponse(str(e))
+    if format == "text":
+        return FastJSONResponse(alerts_text(state, alerts))
+    return FastJSONResponse(AlertsOut.from_records(state, alerts))
 
 # REST endpoint for get_forecast
-@app.get("/get_forecast", tags=["Weather"])
+@app.get(
+    "/get_forecast",
+    tags=["Weather"],
+    response_model=ForecastOut,
+    responses=WEATHER_RESPONSES,
+)
 async def rest_get_forecast(
     latitude: float = Query(..., description="Latitude of the location"),
-    longitude: float = Query(..., description="Longitude of the location")
+    longitude: float = Query(..., description="Longitude of the location"),
+    format: Literal["text", "json"] = FORMAT_QUERY,
+    client: ClientIdentity = Depends(enforce_rate_limit),
 ):
     """REST endpoint to get weather forecast for a location."""
-    return await get_forecast(latitude, longitude)
+    try:
+        gridpoint, periods = await fetch_forecast(latitude, longitude)
+    except WeatherDataError as e:
+        if format == "json":
+            raise HTTPException(status_code=502, detail=str(e))
+        return FastJSONResponse(str(e))
+    if format == "text":
+        return FastJSONResponse(forecast_text(latitude, longitude, periods))
+    return FastJSONResponse(
+        ForecastOut.from_records(latitude, longitude, gridpoint.name, periods)
+    )
+
+# REST endpoint for analyze_gridpoints
+@app.get("/analyze_gridpoints", tags=["Weather"])
+async def rest_analyze_gridpoints(
+    location: list[str] = Query(
+        ..., description='Gridpoint ("STO/41,68") or "latitude,longitude"; repeatable'
+    ),
+    layer: str = Query(
+        "temperature", description="Gridpoint layer, e.g. temperature, windSpeed"
+    ),
+    hours: int = Query(72, description="Length of the window in hours"),
+    aggregation: list[str] | None = Query(
+        None, description="min, max, mean or sum; repeatable"
+    ),
+    below: float | None = Query(None, description="Count hours below this value"),
+    above: float | None = Query(None, description="Count hours above this value"),
+    resample_hours: int | None = Query(
+        None, description="Also aggregate per block of this many hours"
+    ),
+    start: str | None = Query(
+        None, description="ISO-8601 start of the window (default: now)"
+    ),
+    client: ClientIdentity = Depends(identify_client),
+):
+    """REST endpoint to analyse hourly gridpoint data for one or more locations."""
+    # Charged per location, as each one may cost two upstream requests
+    charge_rate_limit(client, cost=call_cost(location))
+    try:
+        return FastJSONResponse(await analyze_gridpoints(
+            location, layer, hours, aggregation, below, above, resample_hours, start
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # # Create SSE transport instance for handling server-sent events
-# sse = SseServerTransport("/sse")  # Root path for SSE events since we handle specific paths in routes
+# # Root path for SSE events since we handle specific paths in routes
+# sse = SseServerTransport("/sse")
 
 # # Add CORS middleware to allow SSE connections
 # from fastapi.middleware.cors import CORSMiddleware
@@ -124,8 +289,6 @@ async def rest_get_forecast(
 
 
 
-from fastapi.responses import PlainTextResponse
-
 @app.get("/logs", tags=["Logs"], response_class=PlainTextResponse)
 async def get_logs():
     """
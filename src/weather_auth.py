@@ -4,7 +4,8 @@ import httpx
 from mcp.server.fastmcp import FastMCP
 from fastapi import HTTPException, status # Import for raising HTTP exceptions
 import logging # Import logging
-from src.weather_support import make_nws_request, format_alert
+from weather_support import make_nws_request, format_alert, format_forecast_period
+from weather_models import parse_alerts, parse_forecast_periods
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO)
@@ -58,16 +59,6 @@ USER_AGENT = "weather-app/1.0" # Use a more descriptive user agent
 # Instructions: {props.get('instruction', 'No specific instructions provided')}
 # """
 
-def format_forecast_period(period: dict) -> str:
-    """Formats a single forecast period into a readable string."""
-    return f"""
-{period.get('name', 'Unknown Period')}:
-Temperature: {period.get('temperature', 'N/A')}°{period.get('temperatureUnit', 'N/A')}
-Wind: {period.get('windSpeed', 'N/A')} {period.get('windDirection', 'N/A')}
-Forecast: {period.get('detailedForecast', 'No detailed forecast available')}
-"""
-
-
 # --- MCP Tools with Input Validation ---
 @mcp.tool()
 async def get_alerts(state: str) -> str:
@@ -96,8 +87,8 @@ async def get_alerts(state: str) -> str:
     if not data["features"]:
         return f"No active alerts found for {state.upper()}."
 
-    # Format alerts (using list comprehension as before)
-    alerts = [format_alert(feature) for feature in data["features"]]
+    # Format alerts from their compact representation
+    alerts = [format_alert(alert) for alert in parse_alerts(data)]
     return "\n---\n".join(alerts)
 
 
@@ -143,7 +134,10 @@ async def get_forecast(latitude: float, longitude: float) -> str:
 
 
     # Format the periods into a readable forecast
-    forecasts = [format_forecast_period(period) for period in periods[:5]] # Only show next 5 periods
+    forecasts = [
+        format_forecast_period(period)
+        for period in parse_forecast_periods(forecast_data, limit=5) # Only show next 5 periods
+    ]
     return "\n---\n".join(forecasts)
 
 
@@ -0,0 +1,363 @@
+# src/weather_cache.py
+
+import asyncio
+import contextvars
+import heapq
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+from rate_limit import ClientIdentity, RateLimiter, current_client, upstream_scheduler
+from weather_models import GridpointRef, parse_alerts, parse_forecast_periods
+from weather_support import NWS_API_BASE, make_nws_request
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+ALERTS_TTL_SECONDS = float(os.environ.get("ALERTS_TTL_SECONDS", "60"))
+FORECAST_TTL_SECONDS = float(os.environ.get("FORECAST_TTL_SECONDS", "900"))
+POINTS_TTL_SECONDS = float(os.environ.get("POINTS_TTL_SECONDS", "86400"))
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "5000"))
+# Popularity scores halve after this many seconds without access
+POPULARITY_HALF_LIFE_SECONDS = float(
+    os.environ.get("POPULARITY_HALF_LIFE_SECONDS", "3600")
+)
+# How many of the hottest keys the scheduler keeps warm
+PREFETCH_HOT_KEYS = int(os.environ.get("PREFETCH_HOT_KEYS", "300"))
+# Keys need at least this decayed hit count to be refreshed ahead of expiry
+PREFETCH_MIN_SCORE = float(os.environ.get("PREFETCH_MIN_SCORE", "2"))
+# Refresh entries this many seconds before they expire
+PREFETCH_LEAD_SECONDS = float(os.environ.get("PREFETCH_LEAD_SECONDS", "15"))
+PREFETCH_INTERVAL_SECONDS = float(os.environ.get("PREFETCH_INTERVAL_SECONDS", "5"))
+# Upstream requests the scheduler may spend per minute
+PREFETCH_BUDGET_PER_MINUTE = float(os.environ.get("PREFETCH_BUDGET_PER_MINUTE", "60"))
+# Weight of prefetch traffic in the fair upstream scheduler (users are 1.0)
+PREFETCH_WEIGHT = float(os.environ.get("PREFETCH_WEIGHT", "0.5"))
+# Optional JSON file: {"states": ["CA"], "locations": [[38.58, -121.49]]}
+CACHE_WARM_LIST = os.environ.get("CACHE_WARM_LIST")
+
+# Cache keys are (namespace, argument) tuples
+Key = tuple[str, Any]
+
+
+# --- Loaders ---
+async def _load_alerts(state: str):
+    data = await make_nws_request(f"{NWS_API_BASE}/alerts/active/area/{state}")
+    if not data or "features" not in data:
+        return None
+    return parse_alerts(data)
+
+
+async def _load_points(coordinates: tuple[float, float]):
+    latitude, longitude = coordinates
+    data = await make_nws_request(f"{NWS_API_BASE}/points/{latitude},{longitude}")
+    if not data:
+        return None
+    return GridpointRef.from_points(data)
+
+
+async def _load_forecast(forecast_url: str):
+    data = await make_nws_request(forecast_url)
+    if not data:
+        return None
+    return parse_forecast_periods(data, source=forecast_url)
+
+
+# Other modules may register further namespaces here (see gridpoint_analytics)
+LOADERS: dict[str, Callable[[Any], Awaitable[Any]]] = {
+    "alerts": _load_alerts,
+    "points": _load_points,
+    "forecast": _load_forecast,
+}
+TTLS = {
+    "alerts": ALERTS_TTL_SECONDS,
+    "points": POINTS_TTL_SECONDS,
+    "forecast": FORECAST_TTL_SECONDS,
+}
+
+
+def alerts_key(state: str) -> Key:
+    return ("alerts", state.upper())
+
+
+def points_key(latitude: float, longitude: float) -> Key:
+    # NWS resolves points at four decimal places
+    return ("points", (round(latitude, 4), round(longitude, 4)))
+
+
+def forecast_key(forecast_url: str) -> Key:
+    return ("forecast", forecast_url)
+
+
+# --- Popularity Tracking ---
+class DecayedLFU:
+    """
+    Exponentially decayed access counts.
+
+    Each key stores its score and the time it was last updated; decay is
+    applied lazily, so a hit is O(1). The number of tracked keys is bounded
+    by dropping the coldest half when the limit is reached.
+    """
+
+    def __init__(
+        self,
+        half_life: float = POPULARITY_HALF_LIFE_SECONDS,
+        max_keys: int = 4 * PREFETCH_HOT_KEYS,
+    ):
+        self.half_life = half_life
+        self.max_keys = max(max_keys, 1)
+        self._scores: dict[Key, tuple[float, float]] = {}
+
+    def _decayed(self, key: Key, now: float) -> float:
+        entry = self._scores.get(key)
+        if entry is None:
+            return 0.0
+        score, updated = entry
+        return score * 0.5 ** ((now - updated) / self.half_life)
+
+    def hit(self, key: Key, amount: float = 1.0) -> None:
+        now = time.monotonic()
+        self._scores[key] = (self._decayed(key, now) + amount, now)
+        if len(self._scores) > self.max_keys:
+            self._prune(now)
+
+    def score(self, key: Key) -> float:
+        return self._decayed(key, time.monotonic())
+
+    def hottest(self, n: int, min_score: float = 0.0) -> list[Key]:
+        """Returns up to n keys with the highest decayed score, hottest first."""
+        now = time.monotonic()
+        scored = ((self._decayed(key, now), key) for key in self._scores)
+        return [
+            key for score, key in heapq.nlargest(n, scored, key=lambda item: item[0])
+            if score >= min_score
+        ]
+
+    def _prune(self, now: float) -> None:
+        keep = heapq.nlargest(
+            self.max_keys // 2, self._scores, key=lambda key: self._decayed(key, now)
+        )
+        self._scores = {key: self._scores[key] for key in keep}
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+# --- Response Cache ---
+class CacheEntry:
+    __slots__ = ("value", "expires_at")
+
+    def __init__(self, value: Any, expires_at: float):
+        self.value = value
+        self.expires_at = expires_at
+
+
+class WeatherCache:
+    """
+    TTL cache of parsed NWS responses with popularity tracking.
+
+    Concurrent misses for the same key share one upstream request. Failed
+    fetches are not cached.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.popularity = DecayedLFU()
+        self._entries: OrderedDict[Key, CacheEntry] = OrderedDict()
+        self._inflight: dict[Key, asyncio.Task] = {}
+
+    def peek(self, key: Key) -> CacheEntry | None:
+        """Returns the entry for a key, fresh or not, without counting an access."""
+        return self._entries.get(key)
+
+    async def get(self, key: Key) -> Any:
+        """Returns the cached value, fetching it on a miss. Counts as an access."""
+        self.popularity.hit(key)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._entries.move_to_end(key)
+            logger.debug(f"Cache hit for {key}")
+            return entry.value
+        logger.debug(f"Cache miss for {key}")
+        return await self.refresh(key)
+
+    async def refresh(self, key: Key) -> Any:
+        """Fetches a key from upstream and stores it, joining any fetch in flight."""
+        identity = current_client.get() or ClientIdentity("anonymous")
+        task = self._inflight.get(key)
+        if task is None:
+            # The shared fetch runs as the client that started it, set
+            # explicitly rather than inheriting the caller's whole context
+            context = contextvars.Context()
+            context.run(current_client.set, identity)
+            task = asyncio.create_task(self._load(key), context=context)
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            # A user joining a fetch queued at prefetch weight should not wait
+            # at that weight
+            upstream_scheduler.promote(task, identity)
+        # Shielded so one cancelled caller does not cancel the shared fetch
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Key) -> Any:
+        namespace, argument = key
+        value = await LOADERS[namespace](argument)
+        if value is not None:
+            self._entries[key] = CacheEntry(value, time.monotonic() + TTLS[namespace])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+weather_cache = WeatherCache()
+
+
+# --- Prefetch Scheduler ---
+class PrefetchScheduler:
+    """
+    Refreshes the hottest cache keys shortly before they expire.
+
+    Every interval, the hottest keys whose entries are missing or expire
+    within the lead time are refreshed, hottest first, until the per-minute
+    upstream budget is spent. Keys from the startup warm list are pinned and
+    always kept warm. Prefetch traffic goes through the fair upstream
+    scheduler with a lower weight than user requests.
+    """
+
+    def __init__(self, cache: WeatherCache = weather_cache):
+        self.cache = cache
+        self.budget = RateLimiter(
+            rate=PREFETCH_BUDGET_PER_MINUTE / 60,
+            burst=max(1.0, PREFETCH_BUDGET_PER_MINUTE * PREFETCH_INTERVAL_SECONDS / 60),
+        )
+        self.pinned: set[Key] = set()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Prefetch scheduler started")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Prefetch scheduler stopped")
+
+    async def _run(self) -> None:
+        current_client.set(ClientIdentity("prefetch", PREFETCH_WEIGHT))
+        if CACHE_WARM_LIST:
+            try:
+                await self.warm(load_warm_list(CACHE_WARM_LIST))
+            except Exception as e:
+                logger.error(f"Cache warm-up failed: {e}", exc_info=True)
+        while True:
+            await asyncio.sleep(PREFETCH_INTERVAL_SECONDS)
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(f"Prefetch tick failed: {e}", exc_info=True)
+
+    def due_keys(self) -> list[Key]:
+        """Hot keys whose entries are missing or about to expire, hottest first."""
+        deadline = time.monotonic() + PREFETCH_LEAD_SECONDS
+        hot = self.cache.popularity.hottest(PREFETCH_HOT_KEYS, PREFETCH_MIN_SCORE)
+        due = []
+        for key in dict.fromkeys(hot + list(self.pinned)):
+            entry = self.cache.peek(key)
+            if entry is None or entry.expires_at <= deadline:
+                due.append(key)
+        return due
+
+    async def tick(self) -> int:
+        """Runs one refresh round; returns how many keys were refreshed."""
+        keys = []
+        for key in self.due_keys():
+            if self.budget.acquire("prefetch") > 0:
+                logger.debug("Prefetch budget exhausted for this round")
+                break
+            keys.append(key)
+        if keys:
+            logger.info(f"Prefetching {len(keys)} hot cache keys")
+            await asyncio.gather(*(self.cache.refresh(key) for key in keys))
+        return len(keys)
+
+    async def warm(self, keys: list[Key]) -> None:
+        """Fetches the startup warm list and pins its keys."""
+        logger.info(f"Warming cache with {len(keys)} keys")
+        self.pinned.update(keys)
+        # Points must resolve before their forecasts can be warmed
+        results = await asyncio.gather(*(self.cache.refresh(key) for key in keys))
+        forecast_keys = [
+            forecast_key(gridpoint.forecast_url)
+            for key, gridpoint in zip(keys, results)
+            if key[0] == "points" and gridpoint and gridpoint.forecast_url
+        ]
+        self.pinned.update(forecast_keys)
+        await asyncio.gather(*(self.cache.refresh(key) for key in forecast_keys))
+
+
+def _is_coordinate(value: Any) -> bool:
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+    )
+
+
+def load_warm_list(path: str) -> list[Key]:
+    """
+    Reads the startup warm list: states and [latitude, longitude] pairs.
+    Malformed entries are logged and skipped.
+    """
+    try:
+        with open(path) as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not read cache warm list {path}: {e}")
+        return []
+    if not isinstance(config, dict):
+        logger.error(f"Cache warm list {path} is not a JSON object")
+        return []
+    states = config.get("states", [])
+    locations = config.get("locations", [])
+    if not isinstance(states, list) or not isinstance(locations, list):
+        logger.error(f"Cache warm list {path}: states and locations must be lists")
+        return []
+    keys = []
+    for state in states:
+        if isinstance(state, str) and state:
+            keys.append(alerts_key(state))
+        else:
+            logger.warning(f"Skipping invalid state in cache warm list: {state!r}")
+    for location in locations:
+        if (
+            isinstance(location, list)
+            and len(location) == 2
+            and all(_is_coordinate(value) for value in location)
+        ):
+            keys.append(points_key(*location))
+        else:
+            logger.warning(
+                f"Skipping invalid location in cache warm list: {location!r}"
+            )
+    return keys
+
+
+prefetch_scheduler = PrefetchScheduler()
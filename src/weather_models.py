@@ -0,0 +1,232 @@
+# src/weather_models.py
+
+import logging
+import sys
+from array import array
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+
+
+def _intern(value: str | None) -> str | None:
+    """Interns repeated short strings (event names, severities, areas) so
+    thousands of alerts share one copy of each."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# --- Geometry ---
+class PackedGeometry:
+    """
+    GeoJSON polygon geometry stored as flat coordinate buffers.
+
+    `coords` holds lon/lat pairs back to back as doubles; `rings` holds the
+    index of the first pair of each ring, so a MultiPolygon costs two arrays
+    instead of nested lists of float objects.
+    """
+    __slots__ = ("type", "coords", "rings")
+
+    def __init__(self, type: str, coords: array, rings: array):
+        self.type = type
+        self.coords = coords
+        self.rings = rings
+
+    @classmethod
+    def from_geojson(cls, geometry: dict | None) -> "PackedGeometry | None":
+        """Packs a Polygon or MultiPolygon; returns None for anything else."""
+        if not geometry:
+            return None
+        geometry_type = geometry.get("type")
+        if geometry_type == "Polygon":
+            polygons = [geometry.get("coordinates", [])]
+        elif geometry_type == "MultiPolygon":
+            polygons = geometry.get("coordinates", [])
+        else:
+            return None
+        coords = array("d")
+        rings = array("I")
+        for polygon in polygons:
+            for ring in polygon:
+                rings.append(len(coords) // 2)
+                for point in ring:
+                    coords.append(point[0])
+                    coords.append(point[1])
+        return cls(_intern(geometry_type), coords, rings)
+
+    def ring(self, index: int) -> list[tuple[float, float]]:
+        """Returns one ring as a list of (lon, lat) pairs."""
+        start = self.rings[index] * 2
+        if index + 1 < len(self.rings):
+            end = self.rings[index + 1] * 2
+        else:
+            end = len(self.coords)
+        return list(zip(self.coords[start:end:2], self.coords[start + 1:end:2]))
+
+    def __len__(self) -> int:
+        return len(self.coords) // 2
+
+
+# --- Gridpoints ---
+class GridpointRef:
+    """Where a /points lookup resolved to: the NWS office grid cell and its URLs."""
+    __slots__ = ("office", "x", "y", "forecast_url", "grid_data_url")
+
+    def __init__(
+        self,
+        office: str | None,
+        x: int | None,
+        y: int | None,
+        forecast_url: str | None,
+        grid_data_url: str | None,
+    ):
+        self.office = office
+        self.x = x
+        self.y = y
+        self.forecast_url = forecast_url
+        self.grid_data_url = grid_data_url
+
+    @classmethod
+    def from_points(cls, data: dict) -> "GridpointRef":
+        """Builds a GridpointRef from a /points response."""
+        props = data.get("properties", {})
+        return cls(
+            office=_intern(props.get("gridId")),
+            x=props.get("gridX"),
+            y=props.get("gridY"),
+            forecast_url=props.get("forecast"),
+            grid_data_url=props.get("forecastGridData"),
+        )
+
+    @property
+    def name(self) -> str:
+        """The gridpoint as "OFFICE/X,Y", e.g. "STO/41,68"."""
+        return f"{self.office}/{self.x},{self.y}"
+
+
+# --- Alerts ---
+class Alert:
+    """The fields of an NWS alert feature that the server actually uses."""
+    __slots__ = (
+        "id",
+        "updated",
+        "event",
+        "area",
+        "severity",
+        "description",
+        "instruction",
+        "geometry",
+    )
+
+    def __init__(
+        self,
+        id: str | None,
+        updated: str | None,
+        event: str | None,
+        area: str | None,
+        severity: str | None,
+        description: str | None,
+        instruction: str | None,
+        geometry: PackedGeometry | None = None,
+    ):
+        self.id = id
+        self.updated = updated
+        self.event = event
+        self.area = area
+        self.severity = severity
+        self.description = description
+        self.instruction = instruction
+        self.geometry = geometry
+
+    @classmethod
+    def from_feature(cls, feature: dict) -> "Alert":
+        """Builds an Alert from a GeoJSON feature of /alerts/active."""
+        props = feature.get("properties", {})
+        return cls(
+            id=props.get("id", feature.get("id")),
+            updated=props.get("updated"),
+            event=_intern(props.get("event")),
+            area=_intern(props.get("areaDesc")),
+            severity=_intern(props.get("severity")),
+            description=props.get("description"),
+            instruction=props.get("instruction"),
+            geometry=PackedGeometry.from_geojson(feature.get("geometry")),
+        )
+
+
+def parse_alerts(data: dict) -> list[Alert]:
+    """Converts an /alerts/active response into compact Alert records."""
+    return [Alert.from_feature(feature) for feature in data.get("features", [])]
+
+
+# --- Forecast Periods ---
+class ForecastPeriod:
+    """The fields of a /forecast period that the server actually uses."""
+    __slots__ = (
+        "number",
+        "name",
+        "temperature",
+        "temperature_unit",
+        "wind_speed",
+        "wind_direction",
+        "detailed_forecast",
+        "version",
+    )
+
+    def __init__(
+        self,
+        number: int | None,
+        name: str | None,
+        temperature: int | float | None,
+        temperature_unit: str | None,
+        wind_speed: str | None,
+        wind_direction: str | None,
+        detailed_forecast: str | None,
+        version: tuple | None = None,
+    ):
+        self.number = number
+        self.name = name
+        self.temperature = temperature
+        self.temperature_unit = temperature_unit
+        self.wind_speed = wind_speed
+        self.wind_direction = wind_direction
+        self.detailed_forecast = detailed_forecast
+        # (forecast URL, updateTime, number) when known; identifies this
+        # period's content for memoized rendering
+        self.version = version
+
+    @classmethod
+    def from_dict(cls, period: dict, version: tuple | None = None) -> "ForecastPeriod":
+        """Builds a ForecastPeriod from one entry of properties.periods."""
+        return cls(
+            number=period.get("number"),
+            name=_intern(period.get("name")),
+            temperature=period.get("temperature"),
+            temperature_unit=_intern(period.get("temperatureUnit")),
+            wind_speed=_intern(period.get("windSpeed")),
+            wind_direction=_intern(period.get("windDirection")),
+            detailed_forecast=period.get("detailedForecast"),
+            version=version,
+        )
+
+
+def parse_forecast_periods(
+    data: dict, limit: int | None = None, source: str | None = None
+) -> list[ForecastPeriod]:
+    """
+    Converts a /forecast response into compact ForecastPeriod records.
+
+    When `source` (the forecast URL) and the response's updateTime are known,
+    each period is versioned so its rendered views can be memoized.
+    """
+    props = data.get("properties", {})
+    periods = props.get("periods", [])
+    if limit is not None:
+        periods = periods[:limit]
+    update_time = props.get("updateTime")
+    versioned = source is not None and update_time is not None
+    return [
+        ForecastPeriod.from_dict(
+            period,
+            (source, update_time, period.get("number")) if versioned else None,
+        )
+        for period in periods
+    ]
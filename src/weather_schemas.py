@@ -0,0 +1,155 @@
+# src/weather_schemas.py
+
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+import pydantic_core
+from pydantic import BaseModel, ConfigDict
+from starlette.responses import JSONResponse
+from weather_models import Alert, ForecastPeriod
+
+# Configure logging for this module
+logger = logging.getLogger(__name__)
+
+# Maximum number of rendered views (text or models) kept in memory
+VIEW_CACHE_SIZE = 10000
+
+
+# --- Memoized Views ---
+class ViewCache:
+    """
+    Bounded LRU of rendered views keyed by a record's identity and version.
+
+    An alert's key is its NWS `id` plus `updated` timestamp, so the same
+    alert is rendered once and reused across states, refreshes and sessions.
+    Records without a version are rendered every time.
+    """
+
+    def __init__(self, maxsize: int = VIEW_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._views: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, key: Hashable | None, build: Callable[[], Any]) -> Any:
+        if key is None:
+            return build()
+        view = self._views.get(key)
+        if view is not None:
+            self._views.move_to_end(key)
+            return view
+        view = self._views[key] = build()
+        if len(self._views) > self.maxsize:
+            self._views.popitem(last=False)
+        return view
+
+    def clear(self) -> None:
+        self._views.clear()
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+
+view_cache = ViewCache()
+
+
+def alert_view_key(kind: str, alert: Alert) -> tuple | None:
+    """View key from an alert's identity and version, or None if NWS gave no id."""
+    if alert.id is None:
+        return None
+    return (kind, alert.id, alert.updated)
+
+
+def period_view_key(kind: str, period: ForecastPeriod) -> tuple | None:
+    """View key from the forecast and update time a period was parsed from."""
+    if period.version is None:
+        return None
+    return (kind, *period.version)
+
+
+# --- Structured Output ---
+class AlertOut(BaseModel):
+    """One active weather alert."""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: str | None
+    updated: str | None
+    event: str | None
+    area: str | None
+    severity: str | None
+    description: str | None
+    instruction: str | None
+
+
+class AlertsOut(BaseModel):
+    """Active alerts for a state."""
+    state: str
+    count: int
+    alerts: list[AlertOut]
+
+    @classmethod
+    def from_records(cls, state: str, alerts: list[Alert]) -> "AlertsOut":
+        return cls(
+            state=state.upper(),
+            count=len(alerts),
+            alerts=[
+                view_cache.get(
+                    alert_view_key("model", alert),
+                    lambda alert=alert: AlertOut.model_validate(alert),
+                )
+                for alert in alerts
+            ],
+        )
+
+
+class ForecastPeriodOut(BaseModel):
+    """One forecast period (e.g. "Tonight")."""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    number: int | None
+    name: str | None
+    temperature: int | float | None
+    temperature_unit: str | None
+    wind_speed: str | None
+    wind_direction: str | None
+    detailed_forecast: str | None
+
+
+class ForecastOut(BaseModel):
+    """Forecast periods for a location."""
+    latitude: float
+    longitude: float
+    gridpoint: str | None
+    periods: list[ForecastPeriodOut]
+
+    @classmethod
+    def from_records(
+        cls,
+        latitude: float,
+        longitude: float,
+        gridpoint: str | None,
+        periods: list[ForecastPeriod],
+    ) -> "ForecastOut":
+        return cls(
+            latitude=latitude,
+            longitude=longitude,
+            gridpoint=gridpoint,
+            periods=[
+                view_cache.get(
+                    period_view_key("model", period),
+                    lambda period=period: ForecastPeriodOut.model_validate(period),
+                )
+                for period in periods
+            ],
+        )
+
+
+# --- Responses ---
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded directly by pydantic-core's serializer.
+
+    Returning this from a route skips FastAPI's jsonable_encoder pass and the
+    stdlib json module; models, dicts and lists are all accepted.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
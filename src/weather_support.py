@@ -1,18 +1,29 @@
 import logging
+import os
 from typing import Any
 import httpx
+from rate_limit import upstream_scheduler
+from weather_models import Alert, ForecastPeriod
+from weather_schemas import alert_view_key, period_view_key, view_cache
 
 # Configure logging for this module
 logger = logging.getLogger(__name__)
 
 # Constants
+# Overridable so benchmarks can point the server at a local NWS stand-in
+NWS_API_BASE = os.getenv("NWS_API_BASE", "https://api.weather.gov")
 USER_AGENT = "weather-app/1.0"
 
 async def make_nws_request(url: str) -> dict[str, Any] | None:
-    """Make a request to the NWS API with proper error handling."""
+    """
+    Make a request to the NWS API with proper error handling.
+
+    Requests are admitted through the weighted fair upstream scheduler, so one
+    busy client cannot monopolise the NWS budget.
+    """
     headers = {"User-Agent": USER_AGENT, "Accept": "application/geo+json"}
     logger.debug(f"Making NWS request to: {url}")
-    async with httpx.AsyncClient() as client:
+    async with upstream_scheduler.slot(), httpx.AsyncClient() as client:
         try:
             response = await client.get(url, headers=headers, timeout=30.0)
             response.raise_for_status()
@@ -22,14 +33,40 @@ async def make_nws_request(url: str) -> dict[str, Any] | None:
             logger.error(f"Error during NWS request to {url}: {e}")
             return None
 
-def format_alert(feature: dict) -> str:
-    """Format an alert feature into a readable string."""
-    props = feature["properties"]
-    logger.debug(f"Formatting alert: {props}")
+def _field(value: Any, default: str) -> Any:
+    """Returns a record field, or a placeholder when NWS left it out."""
+    return default if value is None else value
+
+def format_alert(alert: Alert) -> str:
+    """Format an alert into a readable string."""
+    logger.debug(f"Formatting alert: {alert.id}")
     return f"""
-Event: {props.get('event', 'Unknown')}
-Area: {props.get('areaDesc', 'Unknown')}
-Severity: {props.get('severity', 'Unknown')}
-Description: {props.get('description', 'No description available')}
-Instructions: {props.get('instruction', 'No specific instructions provided')}
+Event: {_field(alert.event, 'Unknown')}
+Area: {_field(alert.area, 'Unknown')}
+Severity: {_field(alert.severity, 'Unknown')}
+Description: {_field(alert.description, 'No description available')}
+Instructions: {_field(alert.instruction, 'No specific instructions provided')}
 """
+
+def format_forecast_period(period: ForecastPeriod) -> str:
+    """Format a forecast period into a readable string."""
+    logger.debug(f"Formatting forecast period: {_field(period.name, 'N/A')}")
+    temperature = (
+        f"{_field(period.temperature, 'N/A')}°{_field(period.temperature_unit, 'N/A')}"
+    )
+    return f"""
+{_field(period.name, 'Unknown Period')}:
+Temperature: {temperature}
+Wind: {_field(period.wind_speed, 'N/A')} {_field(period.wind_direction, 'N/A')}
+Forecast: {_field(period.detailed_forecast, 'No detailed forecast available')}
+"""
+
+def render_alert(alert: Alert) -> str:
+    """Memoized format_alert: each alert version is formatted once and reused."""
+    return view_cache.get(alert_view_key("text", alert), lambda: format_alert(alert))
+
+def render_forecast_period(period: ForecastPeriod) -> str:
+    """Memoized format_forecast_period, keyed by the forecast version."""
+    return view_cache.get(
+        period_view_key("text", period), lambda: format_forecast_period(period)
+    )
@@ -0,0 +1,35 @@
+import pytest
+
+
+class FakeClock:
+    """Stands in for a module's `time`; wall and monotonic clocks share `now`."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Installs one FakeClock as `time` in the modules passed to it.
+
+    Only the modules under test see the fake, so the asyncio event loop keeps
+    its real clock.
+    """
+    fake = FakeClock()
+
+    def install(*modules) -> FakeClock:
+        for module in modules:
+            monkeypatch.setattr(module, "time", fake)
+        return fake
+
+    return install
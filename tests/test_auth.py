@@ -0,0 +1,185 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+import auth
+import weather_app
+from auth import TokenCache
+
+
+@pytest.fixture
+def now(clock):
+    return clock(auth)
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    monkeypatch.setattr(auth, "_session_users", {})
+    return auth._session_users
+
+
+# --- Verified Token Cache ---
+def test_token_cache_returns_claims_until_expiry(now):
+    cache = TokenCache(maxsize=10)
+    cache.put("token", {"username": "alice"}, expires_at=now.now + 60)
+
+    assert cache.get("token") == {"username": "alice"}
+    now.advance(60)
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_token_cache_does_not_keep_raw_tokens(now):
+    cache = TokenCache(maxsize=10)
+    cache.put("secret-token", {"username": "alice"}, expires_at=now.now + 60)
+
+    assert "secret-token" not in cache._entries
+    assert all(isinstance(key, bytes) for key in cache._entries)
+
+
+def test_token_cache_evicts_least_recently_used(now):
+    cache = TokenCache(maxsize=2)
+    cache.put("a", {"username": "a"}, expires_at=now.now + 60)
+    cache.put("b", {"username": "b"}, expires_at=now.now + 60)
+    cache.get("a")
+    cache.put("c", {"username": "c"}, expires_at=now.now + 60)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_token_cache_disabled_with_zero_size(now):
+    cache = TokenCache(maxsize=0)
+    cache.put("token", {"username": "alice"}, expires_at=now.now + 60)
+
+    assert cache.get("token") is None
+
+
+def test_current_user_is_served_from_cache(monkeypatch):
+    monkeypatch.setattr(auth, "token_cache", TokenCache())
+    decoded = []
+    decode = auth.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        decoded.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+    token = auth.create_access_token({"sub": "alice", "roles": ["user"]})
+
+    first = asyncio.run(auth.get_current_user(token))
+    second = asyncio.run(auth.get_current_user(token))
+
+    assert first == second == {"username": "alice", "roles": ["user"]}
+    assert decoded == [token]
+
+
+# --- Password Verification ---
+def test_authenticate_user_verifies_in_the_bcrypt_pool(monkeypatch):
+    hashed = auth.pwd_context.hash("correct horse")
+    monkeypatch.setattr(auth, "fake_users_db", {
+        "alice": {"username": "alice", "hashed_password": hashed, "roles": []},
+    })
+    threads = []
+    verify = auth.verify_password
+
+    def recording_verify(plain, hashed_password):
+        threads.append(threading.current_thread().name)
+        return verify(plain, hashed_password)
+
+    monkeypatch.setattr(auth, "verify_password", recording_verify)
+
+    async def scenario():
+        return (
+            await auth.authenticate_user("alice", "correct horse"),
+            await auth.authenticate_user("alice", "wrong"),
+            await auth.authenticate_user("mallory", "correct horse"),
+        )
+
+    valid, wrong_password, unknown = asyncio.run(scenario())
+
+    assert valid["username"] == "alice"
+    assert wrong_password is None
+    assert unknown is None
+    assert len(threads) == 2
+    assert all(name.startswith("bcrypt") for name in threads)
+
+
+# --- SSE Session Authentication ---
+def test_messages_rejected_for_unbound_session(sessions):
+    client = TestClient(weather_app.app)
+
+    unbound = client.post("/messages/?session_id=" + "0" * 32, json={})
+    assert unbound.status_code == 401
+    assert client.post("/messages/", json={}).status_code == 401
+
+
+def test_messages_accepted_for_bound_session(sessions, monkeypatch):
+    posted = []
+
+    async def handle_post_message(scope, receive, send):
+        posted.append(scope["query_string"])
+        await send({"type": "http.response.start", "status": 202, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    monkeypatch.setattr(weather_app.sse, "handle_post_message", handle_post_message)
+    auth.bind_session("a" * 32, {"username": "alice"})
+
+    response = TestClient(weather_app.app).post(
+        "/messages/?session_id=" + "a" * 32, json={}
+    )
+
+    assert response.status_code == 202
+    assert len(posted) == 1
+
+
+def test_sse_binds_session_for_the_stream(sessions, monkeypatch):
+    session_id = "b" * 32
+    seen_during_session = []
+
+    endpoint_event = (
+        f"event: endpoint\r\ndata: /messages/?session_id={session_id}\r\n\r\n"
+    )
+
+    @asynccontextmanager
+    async def connect_sse(scope, receive, send):
+        await send({
+            "type": "http.response.body",
+            "body": endpoint_event.encode(),
+            "more_body": True,
+        })
+        yield None, None
+
+    async def run(read_stream, write_stream, options):
+        seen_during_session.append(auth.get_session_user(session_id))
+
+    monkeypatch.setattr(weather_app.sse, "connect_sse", connect_sse)
+    monkeypatch.setattr(weather_app.mcp._mcp_server, "run", run)
+
+    async def scenario():
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        scope = {
+            "type": "http", "method": "GET", "path": "/sse", "headers": [],
+            "query_string": b"", "client": ("127.0.0.1", 5000),
+        }
+        request = Request(scope, receive, send)
+        await weather_app.handle_sse(request, current_user={"username": "alice"})
+        return sent
+
+    sent = asyncio.run(scenario())
+
+    assert len(sent) == 1
+    assert seen_during_session == [{"username": "alice"}]
+    assert auth.get_session_user(session_id) is None
@@ -0,0 +1,108 @@
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from gridpoint_analytics import (
+    LayerSeries,
+    analyze_matrix,
+    call_cost,
+    decode_gridpoint,
+    decode_layer,
+    window_matrix,
+)
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+
+START = int(datetime(2025, 5, 11, 10, tzinfo=timezone.utc).timestamp() // 3600)
+
+
+def test_decode_layer_expands_intervals_to_hours():
+    series = decode_layer({
+        "uom": "wmoUnit:degC",
+        "values": [
+            {"validTime": "2025-05-11T10:00:00+00:00/PT1H", "value": 12.5},
+            {"validTime": "2025-05-11T11:00:00+00:00/PT2H", "value": None},
+            {"validTime": "2025-05-11T13:00:00+00:00/PT1H", "value": 9},
+        ],
+    })
+
+    assert series.unit == "wmoUnit:degC"
+    assert series.hours.tolist() == [START, START + 1, START + 2, START + 3]
+    np.testing.assert_array_equal(series.values, [12.5, np.nan, np.nan, 9.0])
+
+
+def test_decode_layer_handles_day_durations_and_offsets():
+    series = decode_layer({
+        "values": [
+            {"validTime": "2025-05-11T03:00:00-07:00/P1DT2H", "value": 0},
+        ],
+    })
+
+    assert len(series.hours) == 26
+    assert series.hours[0] == START
+    assert series.hours[-1] == START + 25
+
+
+def test_decode_layer_rejects_non_numeric_values():
+    weather = {
+        "values": [{
+            "validTime": "2025-05-11T10:00:00+00:00/PT6H",
+            "value": [{"coverage": "patchy", "weather": "fog", "intensity": None}],
+        }],
+    }
+
+    with pytest.raises(TypeError):
+        decode_layer(weather)
+
+
+def test_decode_gridpoint_skips_weather_and_hazards():
+    data = json.loads((FIXTURES / "gridpoint.json").read_text())
+    assert data["properties"]["weather"]["values"]
+    assert data["properties"]["hazards"]["values"]
+
+    layers = decode_gridpoint(data)
+
+    assert "temperature" in layers
+    assert "weather" not in layers
+    assert "hazards" not in layers
+    assert "elevation" not in layers
+
+
+def test_window_matrix_aligns_series_on_the_window():
+    series = LayerSeries(
+        np.array([START - 1, START, START + 2], dtype=np.int64),
+        np.array([1.0, 2.0, 3.0]),
+        None,
+    )
+
+    matrix = window_matrix([series, None], START, 3)
+
+    np.testing.assert_array_equal(matrix, [[2.0, np.nan, 3.0], [np.nan] * 3])
+
+
+def test_analyze_matrix_aggregates_thresholds_and_resamples():
+    matrix = np.array([
+        [-1.0, 2.0, np.nan, 5.0],
+        [np.nan, np.nan, np.nan, np.nan],
+    ])
+
+    results = analyze_matrix(
+        matrix, ("min", "max", "sum"), below=0, above=4, resample_hours=2
+    )
+
+    assert results["min"] == [-1.0, None]
+    assert results["max"] == [5.0, None]
+    assert results["sum"] == [6.0, None]
+    assert results["hours_with_data"] == [3, 0]
+    assert results["hours_below"] == [1, 0]
+    assert results["hours_above"] == [1, 0]
+    assert results["max_2h"] == [[2.0, 5.0], [None, None]]
+
+
+def test_call_cost_charges_per_location():
+    assert call_cost([]) == 1
+    assert call_cost(["STO/41,68", "38.58,-121.49"]) == 2
+    assert call_cost(["STO/41,68"] * 500) == 50
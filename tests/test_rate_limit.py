@@ -0,0 +1,165 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import rate_limit
+import weather_app
+from rate_limit import ClientIdentity, FairScheduler, RateLimiter, make_client_identity
+
+
+@pytest.fixture
+def now(clock):
+    return clock(rate_limit)
+
+
+# --- Token Bucket Rate Limiter ---
+def test_rate_limiter_allows_burst_then_reports_wait(now):
+    limiter = RateLimiter(rate=2, burst=3, idle_seconds=60)
+
+    assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("a") == pytest.approx(0.5)
+    now.advance(0.5)
+    assert limiter.acquire("a") == 0.0
+
+
+def test_rate_limiter_buckets_are_per_client(now):
+    limiter = RateLimiter(rate=1, burst=1, idle_seconds=60)
+
+    assert limiter.acquire("a") == 0.0
+    assert limiter.acquire("a") > 0
+    assert limiter.acquire("b") == 0.0
+
+
+def test_rate_limiter_admits_cost_above_burst_into_debt(now):
+    limiter = RateLimiter(rate=5, burst=20, idle_seconds=60)
+
+    assert limiter.acquire("a", cost=30) == 0.0
+    # 10 tokens of debt plus the 1 requested, refilled at 5 per second
+    assert limiter.acquire("a") == pytest.approx(11 / 5)
+
+
+def test_rate_limiter_evicts_idle_clients_but_not_debt(now):
+    limiter = RateLimiter(rate=1, burst=2, idle_seconds=5)
+    limiter.acquire("idle")
+    limiter.acquire("indebted", cost=10)
+
+    now.advance(6)
+    limiter.acquire("other")
+    assert "idle" not in limiter._buckets
+    assert "indebted" in limiter._buckets
+
+    now.advance(10)
+    limiter.acquire("other")
+    assert "indebted" not in limiter._buckets
+
+
+def test_token_endpoint_is_limited_per_ip(now, monkeypatch):
+    limiter = RateLimiter(rate=1, burst=2, idle_seconds=60)
+    monkeypatch.setattr(rate_limit, "rate_limiter", limiter)
+    client = TestClient(weather_app.app)
+
+    def login():
+        return client.post("/token", data={"username": "nobody", "password": "x"})
+
+    assert [login().status_code for _ in range(2)] == [401, 401]
+    rejected = login()
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "1"
+    assert list(limiter._buckets) == ["ip:testclient"]
+
+
+# --- Client Identity ---
+def test_client_identity_ignores_unknown_api_keys(monkeypatch):
+    monkeypatch.setattr(rate_limit, "API_KEYS", {})
+
+    identity = make_client_identity("made-up", {"username": "alice"}, "10.0.0.1")
+    assert identity.key == "user:alice"
+    assert make_client_identity("made-up", None, "10.0.0.1").key == "ip:10.0.0.1"
+    assert make_client_identity(ip=None).key == "ip:unknown"
+
+
+def test_client_identity_uses_configured_api_keys(monkeypatch):
+    digest = rate_limit.hashlib.sha256(b"s3cret").hexdigest()
+    monkeypatch.setattr(rate_limit, "API_KEYS", {digest: "reporting"})
+    monkeypatch.setattr(rate_limit, "CLIENT_WEIGHTS", {"key:reporting": 2.0})
+
+    identity = make_client_identity("s3cret", {"username": "alice"})
+    assert identity == ClientIdentity("key:reporting", 2.0, "rest")
+
+
+# --- Weighted Fair Upstream Scheduling ---
+def assert_idle(scheduler: FairScheduler) -> None:
+    assert scheduler._active == 0
+    assert not scheduler._queue
+    assert not scheduler._pending
+    assert not scheduler._last_finish
+    assert not scheduler._waiters
+
+
+def test_fair_scheduler_serves_clients_by_weight():
+    async def scenario():
+        scheduler = FairScheduler(concurrency=1)
+        order = []
+
+        async def request(identity):
+            async with scheduler.slot(identity):
+                order.append(identity.key)
+
+        async with scheduler.slot(ClientIdentity("holder")):
+            tasks = [
+                asyncio.create_task(request(ClientIdentity("busy")))
+                for _ in range(4)
+            ]
+            tasks += [
+                asyncio.create_task(request(ClientIdentity("heavy", weight=2)))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        assert_idle(scheduler)
+        return order
+
+    assert asyncio.run(scenario()) == ["heavy", "busy", "heavy", "busy", "busy", "busy"]
+
+
+def test_fair_scheduler_cancelled_waiter_leaves_queue():
+    async def scenario():
+        scheduler = FairScheduler(concurrency=1)
+        await scheduler._acquire(ClientIdentity("holder"))
+        first = asyncio.create_task(scheduler._acquire(ClientIdentity("a")))
+        second = asyncio.create_task(scheduler._acquire(ClientIdentity("b")))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        scheduler._release()
+        await asyncio.wait_for(second, 1)
+        assert scheduler._active == 1
+        scheduler._release()
+        assert_idle(scheduler)
+
+    asyncio.run(scenario())
+
+
+def test_fair_scheduler_passes_on_slot_handed_to_cancelled_waiter():
+    async def scenario():
+        scheduler = FairScheduler(concurrency=1)
+        await scheduler._acquire(ClientIdentity("holder"))
+        first = asyncio.create_task(scheduler._acquire(ClientIdentity("a")))
+        second = asyncio.create_task(scheduler._acquire(ClientIdentity("b")))
+        await asyncio.sleep(0)
+
+        # The slot is handed to the first waiter, which is cancelled before
+        # it gets to run; the slot must move on rather than leak
+        scheduler._release()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        await asyncio.wait_for(second, 1)
+        assert scheduler._active == 1
+        scheduler._release()
+        assert_idle(scheduler)
+
+    asyncio.run(scenario())
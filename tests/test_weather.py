@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from mcp.server.fastmcp.exceptions import ToolError
+
+import weather
+import weather_app
+from rate_limit import ClientIdentity, enforce_rate_limit
+from weather import WeatherDataError
+from weather_models import Alert, ForecastPeriod, GridpointRef
+
+ALERT = Alert("urn:alert:1", "2025-01-01T00:00:00", "Flood Warning", "Sacramento",
+              "Severe", "Rising water", None)
+PERIOD = ForecastPeriod(1, "Tonight", 52, "F", "5 mph", "NW", "Clear")
+GRIDPOINT = GridpointRef("STO", 41, 68, "https://nws/forecast", None)
+
+
+@pytest.fixture
+def nws(monkeypatch):
+    """Serves fixed NWS records to the tools and routes; set `failing` to fail."""
+    state = {"failing": False}
+
+    async def fetch_alerts(state_code):
+        if state["failing"]:
+            raise WeatherDataError("Unable to fetch alerts or no alerts found.")
+        return [ALERT]
+
+    async def fetch_forecast(latitude, longitude):
+        if state["failing"]:
+            raise WeatherDataError("Unable to fetch detailed forecast.")
+        return GRIDPOINT, [PERIOD]
+
+    for module in (weather, weather_app):
+        monkeypatch.setattr(module, "fetch_alerts", fetch_alerts)
+        monkeypatch.setattr(module, "fetch_forecast", fetch_forecast)
+    return state
+
+
+@pytest.fixture
+def client(nws):
+    weather_app.app.dependency_overrides[enforce_rate_limit] = (
+        lambda: ClientIdentity("user:alice")
+    )
+    yield TestClient(weather_app.app)
+    weather_app.app.dependency_overrides.clear()
+
+
+# --- MCP Tools ---
+def test_json_tools_raise_tool_error_when_fetch_fails(nws):
+    nws["failing"] = True
+
+    with pytest.raises(ToolError, match="Unable to fetch alerts"):
+        asyncio.run(weather.get_alerts("CA", format="json"))
+    with pytest.raises(ToolError, match="Unable to fetch detailed forecast"):
+        asyncio.run(weather.get_forecast(38.5, -121.5, format="json"))
+
+
+def test_text_tools_return_the_error_message(nws):
+    nws["failing"] = True
+
+    assert asyncio.run(weather.get_alerts("CA")) == (
+        "Unable to fetch alerts or no alerts found."
+    )
+
+
+# --- REST Routes ---
+@pytest.mark.parametrize("path, params, text", [
+    ("/get_alerts", {"state": "CA"}, weather.alerts_text("CA", [ALERT])),
+    (
+        "/get_forecast",
+        {"latitude": 38.5, "longitude": -121.5},
+        weather.forecast_text(38.5, -121.5, [PERIOD]),
+    ),
+])
+def test_rest_text_is_a_json_string(client, path, params, text):
+    response = client.get(path, params=params)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == text
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/get_alerts", {"state": "CA"}),
+    ("/get_forecast", {"latitude": 38.5, "longitude": -121.5}),
+])
+def test_rest_text_reports_nws_failure_as_a_json_string(client, nws, path, params):
+    nws["failing"] = True
+
+    response = client.get(path, params=params)
+
+    assert response.status_code == 200
+    assert response.json().startswith("Unable to fetch")
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/get_alerts", {"state": "CA"}),
+    ("/get_forecast", {"latitude": 38.5, "longitude": -121.5}),
+])
+def test_rest_json_reports_nws_failure_as_502(client, nws, path, params):
+    nws["failing"] = True
+
+    response = client.get(path, params={**params, "format": "json"})
+
+    assert response.status_code == 502
+    assert response.json()["detail"].startswith("Unable to fetch")
+
+
+def test_rest_json_returns_structured_fields(client):
+    alerts = client.get("/get_alerts", params={"state": "ca", "format": "json"}).json()
+    forecast_params = {"latitude": 38.5, "longitude": -121.5, "format": "json"}
+    forecast = client.get("/get_forecast", params=forecast_params).json()
+
+    assert alerts["state"] == "CA"
+    assert alerts["alerts"][0]["id"] == "urn:alert:1"
+    assert forecast["gridpoint"] == "STO/41,68"
+    assert forecast["periods"][0]["name"] == "Tonight"
@@ -0,0 +1,282 @@
+import asyncio
+import json
+
+import pytest
+
+import rate_limit
+import weather_cache
+from rate_limit import ClientIdentity, FairScheduler, RateLimiter, current_client
+from weather_cache import (
+    CacheEntry,
+    DecayedLFU,
+    PrefetchScheduler,
+    WeatherCache,
+    alerts_key,
+    forecast_key,
+    load_warm_list,
+    points_key,
+)
+from weather_models import GridpointRef
+
+
+@pytest.fixture
+def now(clock):
+    return clock(weather_cache, rate_limit)
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    """Registers a "test" namespace whose loads are counted."""
+    calls = []
+
+    async def load(argument):
+        calls.append(argument)
+        await asyncio.sleep(0)
+        return None if argument == "missing" else f"value:{argument}"
+
+    monkeypatch.setitem(weather_cache.LOADERS, "test", load)
+    monkeypatch.setitem(weather_cache.TTLS, "test", 60)
+    return calls
+
+
+# --- Popularity ---
+def test_decayed_lfu_halves_scores_every_half_life(now):
+    popularity = DecayedLFU(half_life=10, max_keys=10)
+    popularity.hit("a", 8)
+
+    now.advance(10)
+    assert popularity.score("a") == pytest.approx(4)
+    popularity.hit("a")
+    now.advance(20)
+    assert popularity.score("a") == pytest.approx(5 / 4)
+
+
+def test_decayed_lfu_prefers_recent_popularity(now):
+    popularity = DecayedLFU(half_life=10, max_keys=10)
+    popularity.hit("old", 10)
+    now.advance(30)
+    popularity.hit("new", 2)
+
+    assert popularity.hottest(2) == ["new", "old"]
+    assert popularity.hottest(2, min_score=1.5) == ["new"]
+
+
+def test_decayed_lfu_prunes_coldest_keys(now):
+    popularity = DecayedLFU(half_life=10, max_keys=4)
+    for score, key in enumerate("abcde", start=1):
+        popularity.hit(key, score)
+
+    assert len(popularity) == 2
+    assert popularity.hottest(4) == ["e", "d"]
+
+
+# --- Response Cache ---
+def test_cache_shares_concurrent_fetches(loader):
+    async def scenario():
+        cache = WeatherCache()
+        results = await asyncio.gather(*(cache.get(("test", "x")) for _ in range(5)))
+        assert results == ["value:x"] * 5
+        assert await cache.get(("test", "x")) == "value:x"
+
+    asyncio.run(scenario())
+    assert loader == ["x"]
+
+
+def test_cache_does_not_store_failed_fetches(loader):
+    async def scenario():
+        cache = WeatherCache()
+        assert await cache.get(("test", "missing")) is None
+        assert await cache.get(("test", "missing")) is None
+        assert len(cache) == 0
+
+    asyncio.run(scenario())
+    assert loader == ["missing", "missing"]
+
+
+def test_cache_refetches_after_ttl(loader, now):
+    async def scenario():
+        cache = WeatherCache()
+        await cache.get(("test", "x"))
+        now.advance(59)
+        await cache.get(("test", "x"))
+        now.advance(1)
+        await cache.get(("test", "x"))
+
+    asyncio.run(scenario())
+    assert loader == ["x", "x"]
+
+
+def test_cache_evicts_least_recently_used(loader):
+    async def scenario():
+        cache = WeatherCache(max_entries=2)
+        for argument in ("a", "b", "a", "c"):
+            await cache.get(("test", argument))
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert cache.peek(("test", "a")) is not None
+    assert cache.peek(("test", "b")) is None
+
+
+def test_joining_user_promotes_queued_prefetch(monkeypatch):
+    scheduler = FairScheduler(concurrency=1)
+    monkeypatch.setattr(weather_cache, "upstream_scheduler", scheduler)
+    order = []
+
+    async def load(argument):
+        async with scheduler.slot():
+            order.append((argument, current_client.get().key))
+        return argument
+
+    monkeypatch.setitem(weather_cache.LOADERS, "test", load)
+    monkeypatch.setitem(weather_cache.TTLS, "test", 60)
+
+    async def as_client(identity, key):
+        current_client.set(identity)
+        return await cache.refresh(key)
+
+    async def scenario():
+        async with scheduler.slot(ClientIdentity("holder")):
+            tasks = [asyncio.create_task(
+                as_client(ClientIdentity("prefetch", 0.25), ("test", "shared"))
+            )]
+            await asyncio.sleep(0)
+            bob = ClientIdentity("bob")
+            tasks += [
+                asyncio.create_task(as_client(bob, ("test", f"bob{i}")))
+                for i in range(3)
+            ]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(
+                as_client(ClientIdentity("user:alice"), ("test", "shared"))
+            ))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    cache = WeatherCache()
+    asyncio.run(scenario())
+    # Queued at prefetch weight the shared fetch would run last; alice joining
+    # moves it up to where her own request would have queued
+    assert order == [
+        ("bob0", "bob"),
+        ("shared", "prefetch"),
+        ("bob1", "bob"),
+        ("bob2", "bob"),
+    ]
+
+
+# --- Prefetch Scheduler ---
+@pytest.fixture
+def prefetch_config(monkeypatch):
+    monkeypatch.setattr(weather_cache, "PREFETCH_HOT_KEYS", 10)
+    monkeypatch.setattr(weather_cache, "PREFETCH_MIN_SCORE", 2)
+    monkeypatch.setattr(weather_cache, "PREFETCH_LEAD_SECONDS", 15)
+
+
+def test_due_keys_are_hot_keys_about_to_expire(now, prefetch_config):
+    cache = WeatherCache()
+    scheduler = PrefetchScheduler(cache)
+    for key, hits in [("missing", 5), ("expiring", 4), ("fresh", 3), ("cold", 1)]:
+        cache.popularity.hit(("test", key), hits)
+    cache._entries[("test", "expiring")] = CacheEntry("v", now.now + 15)
+    cache._entries[("test", "fresh")] = CacheEntry("v", now.now + 16)
+    scheduler.pinned = {("test", "pinned"), ("test", "fresh")}
+
+    assert scheduler.due_keys() == [
+        ("test", "missing"),
+        ("test", "expiring"),
+        ("test", "pinned"),
+    ]
+
+
+def test_tick_stops_when_budget_is_spent(now, prefetch_config, loader):
+    cache = WeatherCache()
+    scheduler = PrefetchScheduler(cache)
+    scheduler.budget = RateLimiter(rate=1, burst=2, idle_seconds=60)
+    for key, hits in [("a", 5), ("b", 4), ("c", 3)]:
+        cache.popularity.hit(("test", key), hits)
+
+    assert asyncio.run(scheduler.tick()) == 2
+    assert loader == ["a", "b"]
+    assert asyncio.run(scheduler.tick()) == 0
+    now.advance(1)
+    assert asyncio.run(scheduler.tick()) == 1
+    assert loader == ["a", "b", "c"]
+
+
+def test_warm_pins_points_then_their_forecasts(monkeypatch):
+    loads = []
+
+    async def load_points(coordinates):
+        loads.append(("points", coordinates))
+        url = f"https://nws/forecast/{coordinates[0]}"
+        return GridpointRef("STO", 41, 68, url, None)
+
+    async def load(argument):
+        loads.append(("other", argument))
+        return argument
+
+    monkeypatch.setitem(weather_cache.LOADERS, "points", load_points)
+    monkeypatch.setitem(weather_cache.LOADERS, "alerts", load)
+    monkeypatch.setitem(weather_cache.LOADERS, "forecast", load)
+    scheduler = PrefetchScheduler(WeatherCache())
+    keys = [alerts_key("ca"), points_key(38.5, -121.5)]
+
+    asyncio.run(scheduler.warm(keys))
+
+    forecast = forecast_key("https://nws/forecast/38.5")
+    assert scheduler.pinned == {*keys, forecast}
+    assert loads[-1] == ("other", forecast[1])
+    assert scheduler.cache.peek(forecast) is not None
+
+
+def write_warm_list(tmp_path, config) -> str:
+    path = tmp_path / "warm.json"
+    path.write_text(json.dumps(config))
+    return str(path)
+
+
+def test_warm_list_skips_malformed_entries(tmp_path):
+    path = write_warm_list(tmp_path, {
+        "states": ["ca", 7, ""],
+        "locations": [[38.5], ["38.5", "-121.5"], [True, 1], [38.5, -121.5], 5],
+    })
+
+    assert load_warm_list(path) == [alerts_key("CA"), points_key(38.5, -121.5)]
+
+
+@pytest.mark.parametrize("config", [
+    [["CA"]],
+    {"states": "CA"},
+    {"locations": {"lat": 38.5}},
+])
+def test_warm_list_rejects_malformed_files(tmp_path, config):
+    assert load_warm_list(write_warm_list(tmp_path, config)) == []
+
+
+def test_scheduler_keeps_running_when_warm_up_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        weather_cache, "CACHE_WARM_LIST", write_warm_list(tmp_path, {"states": ["CA"]})
+    )
+    monkeypatch.setattr(weather_cache, "PREFETCH_INTERVAL_SECONDS", 0)
+    scheduler = PrefetchScheduler(WeatherCache())
+    ticks = []
+
+    async def warm(keys):
+        raise RuntimeError("upstream down")
+
+    async def tick():
+        ticks.append(len(ticks))
+        return 0
+
+    monkeypatch.setattr(scheduler, "warm", warm)
+    monkeypatch.setattr(scheduler, "tick", tick)
+
+    async def scenario():
+        scheduler.start()
+        while len(ticks) < 2:
+            await asyncio.sleep(0)
+        await scheduler.stop()
+
+    asyncio.run(asyncio.wait_for(scenario(), 1))
+    assert ticks == [0, 1]
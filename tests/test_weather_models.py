@@ -0,0 +1,115 @@
+import pytest
+
+from weather_models import (
+    Alert,
+    PackedGeometry,
+    parse_alerts,
+    parse_forecast_periods,
+)
+from weather_support import format_alert, format_forecast_period
+
+
+def alert_feature(n: int) -> dict:
+    # Build the strings at runtime so each feature holds its own copies
+    return {
+        "id": f"urn:alert:{n}",
+        "properties": {
+            "event": "".join(["Flood ", "Warning"]),
+            "severity": "".join(["Sev", "ere"]),
+            "areaDesc": "".join(["Sacramento", " Valley"]),
+        },
+    }
+
+
+# --- Geometry ---
+def test_polygon_round_trips_through_rings():
+    outer = [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 0.0]]
+    hole = [[0.2, 0.2], [0.4, 0.2], [0.2, 0.4], [0.2, 0.2]]
+    geometry = PackedGeometry.from_geojson(
+        {"type": "Polygon", "coordinates": [outer, hole]}
+    )
+
+    assert geometry.type == "Polygon"
+    assert len(geometry) == 8
+    assert geometry.ring(0) == [tuple(point) for point in outer]
+    assert geometry.ring(1) == [tuple(point) for point in hole]
+
+
+def test_multipolygon_round_trips_through_rings():
+    first = [[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [0.0, 0.0]]
+    second = [[5.0, 5.0], [6.0, 5.0], [5.0, 6.0], [5.0, 5.0]]
+    geometry = PackedGeometry.from_geojson(
+        {"type": "MultiPolygon", "coordinates": [[first], [second]]}
+    )
+
+    assert list(geometry.rings) == [0, 4]
+    assert geometry.ring(0) == [tuple(point) for point in first]
+    assert geometry.ring(1) == [tuple(point) for point in second]
+
+
+def test_unsupported_geometry_is_dropped():
+    assert PackedGeometry.from_geojson(None) is None
+    assert PackedGeometry.from_geojson({"type": "Point", "coordinates": [0, 0]}) is None
+
+
+# --- Alerts ---
+def test_repeated_alert_strings_are_interned():
+    first, second = parse_alerts({"features": [alert_feature(1), alert_feature(2)]})
+
+    assert first.id == "urn:alert:1"
+    assert first.event == "Flood Warning"
+    assert first.event is second.event
+    assert first.severity is second.severity
+    assert first.area is second.area
+
+
+def test_missing_alert_fields_get_placeholders():
+    alert = Alert.from_feature({"properties": {}})
+
+    assert alert.geometry is None
+    assert format_alert(alert) == """
+Event: Unknown
+Area: Unknown
+Severity: Unknown
+Description: No description available
+Instructions: No specific instructions provided
+"""
+
+
+# --- Forecast Periods ---
+FORECAST = {
+    "properties": {
+        "updateTime": "2025-01-01T00:00:00+00:00",
+        "periods": [
+            {"number": n, "name": f"Period {n}", "temperature": 60 + n}
+            for n in range(1, 6)
+        ],
+    }
+}
+
+
+def test_forecast_periods_respect_limit():
+    source = "https://nws/forecast"
+    periods = parse_forecast_periods(FORECAST, limit=2, source=source)
+
+    assert [period.number for period in periods] == [1, 2]
+    assert periods[0].version == (source, "2025-01-01T00:00:00+00:00", 1)
+    assert len(parse_forecast_periods(FORECAST)) == 5
+
+
+def test_forecast_periods_without_source_are_unversioned():
+    periods = parse_forecast_periods(FORECAST, limit=1)
+
+    assert periods[0].version is None
+
+
+@pytest.mark.parametrize("period", [{}, {"temperature": None, "name": None}])
+def test_missing_forecast_fields_get_placeholders(period):
+    (parsed,) = parse_forecast_periods({"properties": {"periods": [period]}})
+
+    assert format_forecast_period(parsed) == """
+Unknown Period:
+Temperature: N/A°N/A
+Wind: N/A N/A
+Forecast: No detailed forecast available
+"""
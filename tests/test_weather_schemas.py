@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+import weather_schemas
+import weather_support
+from weather_models import Alert, ForecastPeriod
+from weather_schemas import AlertsOut, FastJSONResponse, ForecastOut, ViewCache
+
+
+@pytest.fixture
+def formatted(monkeypatch):
+    """Installs an empty view cache and counts the views actually formatted."""
+    cache = ViewCache(maxsize=10)
+    monkeypatch.setattr(weather_support, "view_cache", cache)
+    monkeypatch.setattr(weather_schemas, "view_cache", cache)
+    calls = []
+
+    def counting(format_view):
+        def format(record):
+            calls.append(record)
+            return format_view(record)
+        return format
+
+    for name in ("format_alert", "format_forecast_period"):
+        monkeypatch.setattr(
+            weather_support, name, counting(getattr(weather_support, name))
+        )
+    return calls
+
+
+def make_alert(updated: str, id: str | None = "urn:alert:1") -> Alert:
+    return Alert(id, updated, "Flood Warning", "Sacramento", "Severe", "Rising", None)
+
+
+def make_period(version: tuple | None) -> ForecastPeriod:
+    return ForecastPeriod(1, "Tonight", 52, "F", "5 mph", "NW", "Clear", version)
+
+
+# --- Memoized Views ---
+def test_same_alert_version_is_rendered_once(formatted):
+    first = weather_support.render_alert(make_alert("2025-01-01T00:00:00"))
+    second = weather_support.render_alert(make_alert("2025-01-01T00:00:00"))
+
+    assert first is second
+    assert len(formatted) == 1
+
+
+def test_updated_alert_is_rendered_again(formatted):
+    first = weather_support.render_alert(make_alert("2025-01-01T00:00:00"))
+    weather_support.render_alert(make_alert("2025-01-01T01:00:00"))
+
+    assert len(formatted) == 2
+    assert first == weather_support.format_alert(make_alert("2025-01-01T01:00:00"))
+
+
+def test_alert_without_id_is_never_cached(formatted):
+    weather_support.render_alert(make_alert("2025-01-01T00:00:00", id=None))
+    weather_support.render_alert(make_alert("2025-01-01T00:00:00", id=None))
+
+    assert len(formatted) == 2
+    assert len(weather_support.view_cache) == 0
+
+
+def test_forecast_period_is_rendered_once_per_version(formatted):
+    version = ("https://nws/forecast", "2025-01-01T00:00:00", 1)
+    weather_support.render_forecast_period(make_period(version))
+    weather_support.render_forecast_period(make_period(version))
+
+    assert len(formatted) == 1
+
+
+def test_unversioned_forecast_period_is_never_cached(formatted):
+    weather_support.render_forecast_period(make_period(None))
+    weather_support.render_forecast_period(make_period(None))
+    ForecastOut.from_records(38.5, -121.5, "STO/41,68", [make_period(None)])
+
+    assert len(formatted) == 2
+    assert len(weather_support.view_cache) == 0
+
+
+def test_view_cache_evicts_least_recently_used():
+    cache = ViewCache(maxsize=2)
+    for key in ("a", "b", "a", "c"):
+        cache.get(key, lambda key=key: key.upper())
+
+    assert len(cache) == 2
+    assert cache.get("a", lambda: "rebuilt") == "A"
+    assert cache.get("b", lambda: "rebuilt") == "rebuilt"
+
+
+# --- Responses ---
+def test_fast_json_response_encodes_alerts(formatted):
+    alerts = AlertsOut.from_records("ca", [make_alert("2025-01-01T00:00:00")])
+
+    body = json.loads(FastJSONResponse(alerts).body)
+
+    assert body == alerts.model_dump(mode="json")
+    assert body["state"] == "CA"
+    assert body["alerts"][0]["event"] == "Flood Warning"
+
+
+def test_fast_json_response_encodes_forecast(formatted):
+    forecast = ForecastOut.from_records(
+        38.5, -121.5, "STO/41,68", [make_period(("url", "t", 1))]
+    )
+
+    body = json.loads(FastJSONResponse(forecast).body)
+
+    assert body == forecast.model_dump(mode="json")
+    assert body["periods"][0]["temperature_unit"] == "F"